@@ -0,0 +1,106 @@
+"""Compare the GET /api/excursions serialization paths on synthetic documents.
+
+Usage: python bench_listing.py [--sizes 1000 10000 100000] [--repeat 3]
+
+"model" is the previous path: an Excursion per document, FastAPI's response_model
+validation and serialization, then the stdlib JSON encoder. "fast" is the current
+path: documents shaped into dicts and encoded with orjson.
+
+Nothing is sent to MongoDB, but server.py is imported for the models and helpers.
+Without a backend/.env, placeholder MONGO_URL/DB_NAME values are used - the Motor
+client never connects and the photo pool never starts a worker.
+"""
+import argparse
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timezone, timedelta
+from typing import List
+
+import orjson
+from pydantic import TypeAdapter
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "bench_listing")
+
+from server import CURRENT_SCHEMA_VERSION, Excursion, excursion_listing_dict, empty_rating_histogram
+
+
+def make_documents(count: int) -> List[dict]:
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "title": f"Ausflug {i}",
+            "description": "Ein schöner Ausflug für die ganze Familie mit Grillstelle und Spielplatz.",
+            "address": f"Seestrasse {i}, 8000 Zürich",
+            "country": "Schweiz",
+            "region": "Zürich",
+            "category": "Wanderung",
+            "website_url": None,
+            "has_grill": i % 2 == 0,
+            "is_outdoor": True,
+            "is_free": i % 3 == 0,
+            "parking_situation": "Gut",
+            "parking_is_free": True,
+            "lat": 47.37 + i * 1e-5,
+            "lng": 8.54 + i * 1e-5,
+            "author_id": str(uuid.uuid4()),
+            "author_name": "Test User",
+            "photos": [f"{uuid.uuid4().hex}.jpg", f"{uuid.uuid4().hex}.jpg"],
+            "average_rating": 4.2,
+            "review_count": 12,
+            "rating_sum": 50,
+            "rating_histogram": empty_rating_histogram(),
+            "created_at": (start + timedelta(minutes=i)).isoformat(),
+            "schema_version": CURRENT_SCHEMA_VERSION,
+        }
+        for i in range(count)
+    ]
+
+
+def model_path(documents: List[dict], adapter: TypeAdapter) -> bytes:
+    models = [Excursion(**doc) for doc in documents]
+    # What FastAPI does with response_model=List[Excursion]
+    content = [model.model_dump() for model in models]
+    validated = adapter.validate_python(content)
+    serialized = adapter.dump_python(validated, mode="json")
+    return json.dumps(serialized, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def fast_path(documents: List[dict]) -> bytes:
+    return orjson.dumps([excursion_listing_dict(doc) for doc in documents], option=orjson.OPT_UTC_Z)
+
+
+def best_of(repeat: int, func, make_input) -> float:
+    timings = []
+    for _ in range(repeat):
+        data = make_input()
+        started = time.perf_counter()
+        func(data)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main(sizes: List[int], repeat: int):
+    adapter = TypeAdapter(List[Excursion])
+    sample = make_documents(3)
+    assert json.loads(model_path([dict(doc) for doc in sample], adapter)) == json.loads(fast_path([dict(doc) for doc in sample])), \
+        "fast path output differs from the model path"
+
+    print(f"{'excursions':>10} {'model (ms)':>12} {'fast (ms)':>12} {'speedup':>8}")
+    for size in sizes:
+        documents = make_documents(size)
+        # Both paths mutate or consume their input, so each run gets fresh copies
+        model_seconds = best_of(repeat, lambda docs: model_path(docs, adapter), lambda: [dict(doc) for doc in documents])
+        fast_seconds = best_of(repeat, fast_path, lambda: [dict(doc) for doc in documents])
+        print(f"{size:>10} {model_seconds * 1000:>12.1f} {fast_seconds * 1000:>12.1f} {model_seconds / fast_seconds:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark excursion listing serialization")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    main(args.sizes, args.repeat)
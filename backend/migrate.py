@@ -0,0 +1,28 @@
+"""Run pending excursion schema migrations.
+
+Usage: python migrate.py [--batch-size 500] [--dry-run]
+
+Safe to interrupt and re-run - each document records its own schema_version.
+Run it before starting the server, which refuses to start while any excursion is
+below CURRENT_SCHEMA_VERSION.
+"""
+import argparse
+import asyncio
+
+from server import client, run_migrations
+
+
+async def main(batch_size: int, dry_run: bool):
+    try:
+        migrated = await run_migrations(batch_size=batch_size, dry_run=dry_run)
+        print(f"{'Would migrate' if dry_run else 'Migrated'} {migrated} excursions")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run pending excursion schema migrations")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size, args.dry_run))
@@ -0,0 +1,44 @@
+"""Photo resizing for the variant process pool.
+
+Kept free of import side effects (no database client, no config loading) so the
+forkserver workers that import it start clean.
+"""
+import os
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+from PIL import Image, ImageOps
+
+
+def variant_filename(photo_name: str, variant: str, image_format: str) -> str:
+    """File name of a resized variant of an uploaded photo"""
+    return f"{Path(photo_name).stem}_{variant}.{image_format}"
+
+
+def generate_photo_variants(source: str, variant_dir: str, variants: Dict[str, int], formats: Sequence[str]) -> List[str]:
+    """Write every size/format variant of a photo into variant_dir; runs in the photo process pool"""
+    written = []
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA"):
+            has_alpha = image.mode in ("LA", "PA") or "transparency" in image.info
+            image = image.convert("RGBA" if has_alpha else "RGB")
+
+        for variant, max_edge in variants.items():
+            resized = image.copy()
+            resized.thumbnail((max_edge, max_edge), Image.LANCZOS)
+
+            for image_format in formats:
+                target = Path(variant_dir) / variant_filename(Path(source).name, variant, image_format)
+                temp_target = target.with_name(f".{target.name}.part")
+                if image_format == "jpg":
+                    flattened = resized
+                    if resized.mode == "RGBA":
+                        flattened = Image.new("RGB", resized.size, (255, 255, 255))
+                        flattened.paste(resized, mask=resized.split()[3])
+                    flattened.save(temp_target, "JPEG", quality=82, optimize=True, progressive=True)
+                else:
+                    resized.save(temp_target, "WEBP", quality=80, method=4)
+                os.replace(temp_target, target)
+                written.append(target.name)
+    return written
@@ -1,7 +1,11 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, Cookie, Request, UploadFile, File
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Cookie, Request, Response, UploadFile, Query, BackgroundTasks
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.datastructures import UploadFile as FormFile
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel, ReturnDocument, UpdateOne
+from pymongo.errors import OperationFailure, DuplicateKeyError
 from dotenv import load_dotenv
 from pathlib import Path
 import os
@@ -10,31 +14,290 @@ import uuid
 import shutil
 from datetime import datetime, timezone, timedelta
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field, EmailStr
+from pydantic import BaseModel, Field, EmailStr, ValidationError, model_validator
+from types import MappingProxyType
 from enum import Enum
+from abc import ABC, abstractmethod
 import aiofiles
-import requests
+import aiofiles.os
+import httpx
 import bcrypt
 from jose import JWTError, jwt
 import secrets
+import base64
+import json
+import orjson
+import hashlib
+import mimetypes
+import unicodedata
+import time
+from collections import OrderedDict
+import bisect
+import heapq
+import itertools
+import asyncio
+from contextvars import ContextVar
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+from photo_variants import generate_photo_variants, variant_filename
+from prometheus_client import Counter, Gauge, Histogram, generate_latest, CONTENT_TYPE_LATEST
+from pymongo import monitoring
 
 ROOT_DIR = Path(__file__).parent
+logger = logging.getLogger(__name__)
 load_dotenv(ROOT_DIR / '.env')
 
+# Metrics - exposed in Prometheus text format on /metrics
+RESPONSE_SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+EVENT_LOOP_LAG_INTERVAL_SECONDS = float(os.environ.get('EVENT_LOOP_LAG_INTERVAL_SECONDS', 0.5))
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "Request latency by route", ["method", "route", "status"]
+)
+http_response_size = Histogram(
+    "http_response_size_bytes", "Response body size by route", ["method", "route"], buckets=RESPONSE_SIZE_BUCKETS
+)
+http_requests_in_flight = Gauge("http_requests_in_flight", "Requests currently being handled")
+mongo_command_duration = Histogram(
+    "mongo_command_duration_seconds", "MongoDB command latency by collection and operation", ["collection", "command"]
+)
+mongo_command_failures = Counter(
+    "mongo_command_failures_total", "Failed MongoDB commands by collection and operation", ["collection", "command"]
+)
+event_loop_lag = Gauge("event_loop_lag_seconds", "How late the event loop woke up a timer on the last check")
+
+# Tracing Configuration - opt in with TRACING_ENABLED=1
+TRACING_ENABLED = os.environ.get('TRACING_ENABLED', '').lower() in ('1', 'true', 'yes')
+TRACE_EXPORT_FILE = os.environ.get('TRACE_EXPORT_FILE')
+# OTLP/HTTP JSON endpoint of a collector, e.g. http://localhost:4318/v1/traces
+TRACE_EXPORT_URL = os.environ.get('TRACE_EXPORT_URL')
+TRACE_SERVICE_NAME = os.environ.get('TRACE_SERVICE_NAME', 'ausfluege-backend')
+TRACE_EXPORT_BATCH_SIZE = 100
+TRACE_EXPORT_QUEUE_SIZE = 2000
+SLOW_REQUEST_THRESHOLD_MS = float(os.environ.get('SLOW_REQUEST_THRESHOLD_MS', 500))
+REQUEST_ID_HEADER = "X-Request-ID"
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Time every command the driver sends; runs on the driver's threads, not the event loop"""
+
+    def __init__(self):
+        self._started: Dict[tuple, tuple] = {}
+
+    @staticmethod
+    def _labels(event: monitoring.CommandStartedEvent) -> tuple:
+        command = event.command_name
+        target = event.command.get(command)
+        if command == "getMore":
+            target = event.command.get("collection")
+        return (target if isinstance(target, str) else "-", command)
+
+    def started(self, event):
+        self._started[(event.connection_id, event.request_id)] = self._labels(event)
+
+    def succeeded(self, event):
+        labels = self._started.pop((event.connection_id, event.request_id), None)
+        if labels:
+            mongo_command_duration.labels(*labels).observe(event.duration_micros / 1_000_000)
+
+    def failed(self, event):
+        labels = self._started.pop((event.connection_id, event.request_id), None)
+        if labels:
+            mongo_command_duration.labels(*labels).observe(event.duration_micros / 1_000_000)
+            mongo_command_failures.labels(*labels).inc()
+
+# Tracing - spans of the current request are collected through context variables
+current_trace: ContextVar[Optional["RequestTrace"]] = ContextVar("current_trace", default=None)
+current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+class RequestTrace:
+    """All finished spans of one request"""
+
+    def __init__(self, request_id: str, trace_id: str):
+        self.request_id = request_id
+        self.trace_id = trace_id
+        self.spans: List["Span"] = []
+
+class Span:
+    """One timed phase of a request, nested under whichever span was active when it started"""
+    __slots__ = ("trace", "name", "span_id", "parent_id", "attributes", "start_ns", "end_ns", "_token")
+
+    def __init__(self, trace: RequestTrace, name: str, parent_id: Optional[str], attributes: dict):
+        self.trace = trace
+        self.name = name
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start_ns = 0
+        self.end_ns = 0
+        self._token = None
+
+    def __enter__(self):
+        self._token = current_span.set(self)
+        self.start_ns = time.time_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = time.time_ns()
+        current_span.reset(self._token)
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        self.trace.spans.append(self)
+        return False
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1_000_000
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+class NoopSpan:
+    """Stand-in returned while no request is being traced"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+NOOP_SPAN = NoopSpan()
+
+def trace_span(name: str, **attributes):
+    """Time a phase of the current request as a child of the active span; costs one lookup when tracing is off"""
+    trace = current_trace.get()
+    if trace is None:
+        return NOOP_SPAN
+    parent = current_span.get()
+    return Span(trace, name, parent.span_id if parent else None, attributes)
+
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+# tz_aware so native BSON dates (sessions, cleanup queue) come back comparable with aware datetimes
+client = AsyncIOMotorClient(mongo_url, tz_aware=True, event_listeners=[MongoCommandMetrics()])
 db = client[os.environ['DB_NAME']]
 
+# Transactions need a replica set or sharded cluster; set at startup
+transactions_supported = False
+
+async def detect_transaction_support():
+    global transactions_supported
+    hello = await client.admin.command("hello")
+    transactions_supported = "setName" in hello or hello.get("msg") == "isdbgrid"
+    if not transactions_supported:
+        logger.warning("MongoDB is a standalone server; multi-document deletes run without a transaction")
+
+async def run_transaction(operations):
+    """Run operations(session) as one transaction, or as ordered plain writes (session=None) on a standalone server"""
+    if not transactions_supported:
+        return await operations(None)
+    async with await client.start_session() as session:
+        return await session.with_transaction(operations)
+
 # Create upload directory
 UPLOAD_DIR = ROOT_DIR / "uploads" / "photos"
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+VARIANT_DIR = UPLOAD_DIR / "variants"
+VARIANT_DIR.mkdir(parents=True, exist_ok=True)
+
+# Upload Configuration
+UPLOAD_CHUNK_SIZE = 64 * 1024
+MAX_PHOTO_BYTES = int(os.environ.get('MAX_PHOTO_BYTES', 10 * 1024 * 1024))
+MAX_UPLOAD_BYTES = int(os.environ.get('MAX_UPLOAD_BYTES', 50 * 1024 * 1024))
+
+# Photo variant Configuration - longest edge in pixels
+PHOTO_VARIANTS = {"thumb": 200, "card": 480, "full": 1600}
+PHOTO_VARIANT_FORMATS = ("jpg", "webp")
+PHOTO_PROCESS_WORKERS = int(os.environ.get('PHOTO_PROCESS_WORKERS', 2))
+VARIANT_FAILURE_TTL_SECONDS = int(os.environ.get('VARIANT_FAILURE_TTL_SECONDS', 24 * 60 * 60))
+VARIANT_FAILURE_MAX_ENTRIES = 10000
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Photo cleanup Configuration
+PHOTO_CLEANUP_POLL_SECONDS = int(os.environ.get('PHOTO_CLEANUP_POLL_SECONDS', 30))
+PHOTO_CLEANUP_LEASE_SECONDS = int(os.environ.get('PHOTO_CLEANUP_LEASE_SECONDS', 300))
+PHOTO_CLEANUP_RETRY_BASE_SECONDS = int(os.environ.get('PHOTO_CLEANUP_RETRY_BASE_SECONDS', 10))
+PHOTO_CLEANUP_RETRY_MAX_SECONDS = int(os.environ.get('PHOTO_CLEANUP_RETRY_MAX_SECONDS', 3600))
+# How often, and for how long, an upload re-checks a photo whose files the cleanup worker is removing
+PHOTO_DELETING_POLL_SECONDS = 0.1
+PHOTO_DELETING_WAIT_SECONDS = float(os.environ.get('PHOTO_DELETING_WAIT_SECONDS', 2))
+# One of off, dry-run or on. The sweep queues files no excursion references for removal, so it stays off
+# until a dry run against the deployed database has shown what it would delete
+PHOTO_SWEEP = os.environ.get('PHOTO_SWEEP', 'off')
+PHOTO_SWEEP_INTERVAL_SECONDS = int(os.environ.get('PHOTO_SWEEP_INTERVAL_SECONDS', 6 * 60 * 60))
+# Files and photo references younger than this may belong to an upload that is still in flight
+PHOTO_SWEEP_GRACE_SECONDS = int(os.environ.get('PHOTO_SWEEP_GRACE_SECONDS', 60 * 60))
 
 # JWT Configuration
 SECRET_KEY = os.environ.get('SECRET_KEY', secrets.token_urlsafe(32))
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 7 * 24 * 60  # 7 days
 
+# Session Configuration
+SESSION_TTL_DAYS = 7
+MAX_SESSIONS_PER_USER = int(os.environ.get('MAX_SESSIONS_PER_USER', 10))
+
+# OAuth provider Configuration
+AUTH_PROVIDER_URL = os.environ.get('AUTH_PROVIDER_URL', 'https://demobackend.emergentagent.com').rstrip('/')
+AUTH_PROVIDER_CONNECT_TIMEOUT = float(os.environ.get('AUTH_PROVIDER_CONNECT_TIMEOUT', 3))
+AUTH_PROVIDER_READ_TIMEOUT = float(os.environ.get('AUTH_PROVIDER_READ_TIMEOUT', 10))
+AUTH_PROVIDER_RETRIES = int(os.environ.get('AUTH_PROVIDER_RETRIES', 2))
+AUTH_PROVIDER_FAILURE_THRESHOLD = int(os.environ.get('AUTH_PROVIDER_FAILURE_THRESHOLD', 5))
+AUTH_PROVIDER_RESET_SECONDS = float(os.environ.get('AUTH_PROVIDER_RESET_SECONDS', 30))
+
+# Password hashing Configuration
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', 12))
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 4))
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 64))
+
+# Geocoding Configuration
+# One of none, static or nominatim - the public OSM service is only used when chosen explicitly
+GEOCODER = os.environ.get('GEOCODER', 'none')
+GEOCODER_URL = os.environ.get('GEOCODER_URL', 'https://nominatim.openstreetmap.org').rstrip('/')
+GEOCODER_TIMEOUT = float(os.environ.get('GEOCODER_TIMEOUT', 5))
+STATIC_GEOCODER_FILE = os.environ.get('STATIC_GEOCODER_FILE')
+
+# Map clustering Configuration
+CLUSTER_CACHE_TTL_SECONDS = int(os.environ.get('CLUSTER_CACHE_TTL_SECONDS', 300))
+GEOHASH_PRECISION = 9
+# Geohash cell size roughly matching a marker-sized patch of screen at each map zoom level (0-20)
+ZOOM_TO_GEOHASH_PRECISION = [1, 1, 1, 2, 2, 2, 3, 3, 4, 4, 5, 5, 6, 6, 7, 7, 8, 8, 9, 9, 9]
+# Upper bound on the cells one clusters request visits and returns; wider viewports get coarser cells
+MAX_CLUSTER_CELLS = int(os.environ.get('MAX_CLUSTER_CELLS', 256))
+
+# Facet Configuration
+FACET_CACHE_TTL_SECONDS = int(os.environ.get('FACET_CACHE_TTL_SECONDS', 60))
+FACET_CACHE_MAX_ENTRIES = 1024
+FACET_FIELDS = ["country", "region", "category", "is_free", "is_outdoor", "has_grill"]
+
+# Autocomplete Configuration
+AUTOCOMPLETE_REFRESH_SECONDS = int(os.environ.get('AUTOCOMPLETE_REFRESH_SECONDS', 300))
+MAX_AUTOCOMPLETE_RESULTS = 20
+
+# Auth cache Configuration
+AUTH_CACHE_TTL_SECONDS = int(os.environ.get('AUTH_CACHE_TTL_SECONDS', 60))
+# Logout only clears the cache of the worker that served it; session-token entries are kept this
+# short so a logged-out session stops working on the other workers soon after
+AUTH_SESSION_CACHE_TTL_SECONDS = int(os.environ.get('AUTH_SESSION_CACHE_TTL_SECONDS', 5))
+AUTH_CACHE_MAX_ENTRIES = int(os.environ.get('AUTH_CACHE_MAX_ENTRIES', 10000))
+
+# Pagination Configuration
+DEFAULT_PAGE_SIZE = 24
+MAX_PAGE_SIZE = 100
+MAX_GEO_RESULTS = 500
+MAX_GEO_RADIUS_KM = 500
+
+# Search Configuration - how strongly a perfect 5-star average boosts text relevance
+SEARCH_RATING_WEIGHT = float(os.environ.get('SEARCH_RATING_WEIGHT', 0.5))
+# Partial-word matches from the autocomplete index score like a single weak text hit
+PREFIX_MATCH_SCORE = 1.0
+MAX_PREFIX_MATCHES = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
 app = FastAPI()
 api_router = APIRouter(prefix="/api")
 
@@ -171,6 +434,69 @@ class ParkingSituation(str, Enum):
     POOR = "Schlecht"
     NONE = "Keine Parkplätze"
 
+# Enum lookup tables, built once at import
+# Region options per country value
+REGION_OPTIONS = {
+    Country.CH.value: [(region.name, region.value) for region in SwissCantons],
+    Country.DE.value: [(region.name, region.value) for region in GermanStates],
+    Country.IT.value: [(region.name, region.value) for region in ItalianRegions],
+    Country.FR.value: [(region.name, region.value) for region in FrenchRegions],
+    Country.AT.value: [(region.name, region.value) for region in AustrianStates]
+}
+
+def enum_lookup(pairs) -> MappingProxyType:
+    """Frozen map accepting either the key (e.g. "CH") or the label ("Schweiz"), both resolving to the label"""
+    lookup = {}
+    for key, value in pairs:
+        lookup[key] = value
+        lookup[value] = value
+    return MappingProxyType(lookup)
+
+COUNTRY_LOOKUP = enum_lookup((country.name, country.value) for country in Country)
+CATEGORY_LOOKUP = enum_lookup((category.name, category.value) for category in Category)
+PARKING_LOOKUP = enum_lookup((parking.name, parking.value) for parking in ParkingSituation)
+REGION_LOOKUPS = MappingProxyType({country: enum_lookup(regions) for country, regions in REGION_OPTIONS.items()})
+
+# Excursion schema versions - see run_migrations
+CURRENT_SCHEMA_VERSION = 2
+COUNTRY_REGION_SCHEMA_VERSION = 1  # country/region replace the Switzerland-only canton
+RATING_TOTALS_SCHEMA_VERSION = 2  # rating_sum/review_count/rating_histogram are running totals
+
+def canton_migration_fields(doc: dict) -> dict:
+    """Fields a pre-v1 (Switzerland-only, 'canton') document needs to match the country/region format"""
+    fields = {}
+    if "country" not in doc:
+        fields["country"] = "Schweiz"  # Old data was Switzerland only
+    if "region" not in doc:
+        fields["region"] = doc.get("canton") or "Zürich"
+    return fields
+
+def upgrade_legacy_excursion(doc: dict) -> dict:
+    """Read-time fallback for documents the migration runner has not reached yet; migrated ones pass straight through"""
+    if doc.get("schema_version", 0) < COUNTRY_REGION_SCHEMA_VERSION:
+        doc.update(canton_migration_fields(doc))
+    return doc
+
+def finish_projected_excursion(doc: dict, projection: dict) -> dict:
+    """Upgrade a partial document, then drop the helper fields the client did not ask for"""
+    upgrade_legacy_excursion(doc)
+    doc.pop("canton", None)
+    doc.pop("schema_version", None)
+    for field in ("country", "region"):
+        if field not in projection:
+            doc.pop(field, None)
+    return doc
+
+def empty_rating_histogram() -> Dict[str, int]:
+    """Per-star review counts, keyed by star as string for Mongo field paths"""
+    return {str(star): 0 for star in range(1, 6)}
+
+def compute_average_rating(rating_sum: int, review_count: int) -> float:
+    """Derive the displayed average from the running rating totals"""
+    if not review_count:
+        return 0.0
+    return round(rating_sum / review_count, 1)
+
 # Models
 class User(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -197,7 +523,7 @@ class Token(BaseModel):
 class Session(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     user_id: str
-    session_token: str
+    token_hash: str
     expires_at: datetime
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
@@ -214,6 +540,41 @@ class ExcursionCreate(BaseModel):
     is_free: bool = True
     parking_situation: str  # Accept string, validate in endpoint
     parking_is_free: bool = True
+    lat: Optional[float] = Field(None, ge=-90, le=90)  # Geocoded from the address when omitted
+    lng: Optional[float] = Field(None, ge=-180, le=180)
+
+class ExcursionInput(ExcursionCreate):
+    """ExcursionCreate with enum keys normalized to their stored labels; only used for incoming data,
+    never for documents read back from Mongo"""
+
+    @model_validator(mode="after")
+    def normalize_enums(self):
+        country = COUNTRY_LOOKUP.get(self.country)
+        if country is None:
+            raise ValueError(f"Invalid country: {self.country}")
+
+        region = REGION_LOOKUPS[country].get(self.region)
+        if region is None:
+            raise ValueError(f"Invalid region for country {country}: {self.region}")
+
+        category = CATEGORY_LOOKUP.get(self.category)
+        if category is None:
+            raise ValueError(f"Invalid category: {self.category}")
+
+        parking_situation = PARKING_LOOKUP.get(self.parking_situation)
+        if parking_situation is None:
+            raise ValueError(f"Invalid parking situation: {self.parking_situation}")
+
+        self.country, self.region, self.category, self.parking_situation = country, region, category, parking_situation
+        return self
+
+def normalize_excursion_input(excursion_data: ExcursionCreate) -> dict:
+    """Validate and normalize the enum fields of a create/update payload, reporting problems as 400"""
+    try:
+        return ExcursionInput.model_validate(excursion_data.model_dump()).model_dump()
+    except ValidationError as e:
+        error = e.errors()[0]
+        raise HTTPException(status_code=400, detail=str(error.get("ctx", {}).get("error", error["msg"])))
 
 class Excursion(ExcursionCreate):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -222,8 +583,16 @@ class Excursion(ExcursionCreate):
     photos: List[str] = []
     average_rating: float = 0.0
     review_count: int = 0
+    rating_sum: int = 0
+    rating_histogram: Dict[str, int] = Field(default_factory=lambda: empty_rating_histogram())
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+class ExcursionWithDistance(Excursion):
+    distance_km: float
+
+class ExcursionSearchResult(Excursion):
+    relevance: float
+
 class ReviewCreate(BaseModel):
     rating: int = Field(..., ge=1, le=5)
     comment: str = Field(..., min_length=10, max_length=1000)
@@ -235,33 +604,134 @@ class Review(ReviewCreate):
     user_name: str
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+class UserReview(Review):
+    excursion_title: Optional[str] = None
+
+class ReviewSummary(BaseModel):
+    review_count: int
+    average_rating: Optional[float] = None
+    rating_histogram: Dict[str, int]
+
 # Auth functions
+class TTLCache:
+    """Bounded LRU where every entry carries its own expiry"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Any, tuple]" = OrderedDict()
+
+    def get(self, key: Any) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires = entry
+        if time.monotonic() >= expires:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: Any, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl_seconds if ttl is None else min(ttl, self.ttl_seconds)
+        if ttl <= 0:
+            return
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: Any):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+def hash_token(token: str) -> str:
+    """Tokens are only ever stored and cached under their SHA-256"""
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+class UserCache(TTLCache):
+    """Resolved users keyed by token hash, each entry expiring with its token"""
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hash_token(token)
+
+    def get(self, token: str) -> Optional[User]:
+        return super().get(self._key(token))
+
+    def put(self, token: str, user: User, expires_at: Optional[datetime] = None):
+        ttl = None
+        if expires_at is not None:
+            # Never serve a user past the expiry of the token or session that resolved it
+            ttl = (expires_at - datetime.now(timezone.utc)).total_seconds()
+        super().put(self._key(token), user, ttl)
+
+    def invalidate_token(self, token: str):
+        self.pop(self._key(token))
+
+    def invalidate_user(self, user_id: str):
+        stale = [key for key, (user, _) in self._entries.items() if user.id == user_id]
+        for key in stale:
+            del self._entries[key]
+
+user_cache = UserCache(AUTH_CACHE_MAX_ENTRIES, AUTH_CACHE_TTL_SECONDS)
+
+def looks_like_jwt(token: str) -> bool:
+    """JWTs are three dot-separated segments; OAuth session tokens are not"""
+    return token.count(".") == 2
+
+def get_request_token(request: Request, session_token: Optional[str]) -> Optional[str]:
+    """Read the auth token from the session cookie or the Authorization header"""
+    if session_token:
+        return session_token
+    auth_header = request.headers.get("Authorization")
+    if auth_header and auth_header.startswith("Bearer "):
+        return auth_header.split(" ")[1]
+    return None
+
 async def get_current_user(request: Request, session_token: str = Cookie(None, alias="session_token")):
-    token = session_token
-    
-    if not token:
-        auth_header = request.headers.get("Authorization")
-        if auth_header and auth_header.startswith("Bearer "):
-            token = auth_header.split(" ")[1]
+    with trace_span("auth"):
+        return await authenticate_request(request, session_token)
+
+async def authenticate_request(request: Request, session_token: Optional[str]) -> User:
+    token = get_request_token(request, session_token)
     
     if not token:
         raise HTTPException(status_code=401, detail="Not authenticated")
+
+    cached_user = user_cache.get(token)
+    if cached_user:
+        return cached_user
     
     # First try to verify as JWT token (normal login)
-    payload = verify_token(token)
-    if payload:
-        user_id = payload.get("sub")
-        if user_id:
-            user = await db.users.find_one({"id": user_id})
-            if user:
-                return User(**user)
-    
-    # If not JWT, try as OAuth session token
-    session = await db.sessions.find_one({"session_token": token})
-    if session and datetime.now(timezone.utc) <= session["expires_at"]:
-        user = await db.users.find_one({"id": session["user_id"]})
+    if looks_like_jwt(token):
+        with trace_span("auth.jwt_decode"):
+            payload = verify_token(token)
+        if payload:
+            user_id = payload.get("sub")
+            if user_id:
+                with trace_span("auth.user_lookup", **{"db.collection": "users", "db.operation": "find_one"}):
+                    user = await db.users.find_one({"id": user_id})
+                if user:
+                    user = User(**user)
+                    expires_at = datetime.fromtimestamp(payload["exp"], timezone.utc) if "exp" in payload else None
+                    user_cache.put(token, user, expires_at)
+                    return user
+    
+    # If not JWT, try as OAuth session token. The TTL monitor only runs once a minute,
+    # so expiry is checked in the query as well.
+    with trace_span("auth.session_lookup", **{"db.collection": "sessions", "db.operation": "find_one"}):
+        session = await db.sessions.find_one({"_id": hash_token(token), "expires_at": {"$gt": datetime.now(timezone.utc)}})
+    if session:
+        with trace_span("auth.user_lookup", **{"db.collection": "users", "db.operation": "find_one"}):
+            user = await db.users.find_one({"id": session["user_id"]})
         if user:
-            return User(**user)
+            user = User(**user)
+            cache_until = datetime.now(timezone.utc) + timedelta(seconds=AUTH_SESSION_CACHE_TTL_SECONDS)
+            user_cache.put(token, user, min(session["expires_at"], cache_until))
+            return user
     
     raise HTTPException(status_code=401, detail="Invalid or expired token")
 
@@ -287,15 +757,121 @@ def parse_from_mongo(item: dict) -> dict:
         item['expires_at'] = datetime.fromisoformat(item['expires_at'])
     return item
 
+# Pagination and projection utilities
+EXCURSION_FIELDS = set(Excursion.model_fields.keys())
+EXCURSION_CARD_FIELDS = [
+    "id", "title", "description", "address", "lat", "lng", "country", "region", "category", "photos", "is_free",
+    "is_outdoor", "has_grill", "author_name", "average_rating", "review_count", "created_at"
+]
+
+def encode_cursor(created_at: Any, item_id: str) -> str:
+    """Encode the (created_at, id) keyset position as an opaque cursor"""
+    if isinstance(created_at, datetime):
+        created_at = created_at.isoformat()
+    raw = json.dumps([created_at, item_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple:
+    """Decode an opaque cursor back into its (created_at, id) keyset position"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(created_at, str) or not isinstance(item_id, str):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return created_at, item_id
+
+def keyset_filter(cursor: str) -> dict:
+    """Build the query clause selecting everything after the cursor in (created_at, id) descending order"""
+    created_at, item_id = decode_cursor(cursor)
+    return {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "id": {"$lt": item_id}}
+    ]}
+
+def build_excursion_projection(fields: Optional[str]) -> Optional[dict]:
+    """Translate the fields= query parameter into a Mongo projection (None means full documents)"""
+    if not fields:
+        return None
+
+    if fields == "card":
+        # List cards only show the first photo
+        projection = {field: 1 for field in EXCURSION_CARD_FIELDS}
+        projection["photos"] = {"$slice": 1}
+    else:
+        requested = [field.strip() for field in fields.split(",") if field.strip()]
+        invalid = [field for field in requested if field not in EXCURSION_FIELDS]
+        if invalid:
+            raise HTTPException(status_code=400, detail=f"Invalid fields: {', '.join(invalid)}")
+        projection = {field: 1 for field in requested}
+
+    # Keyset pagination and legacy canton documents need these
+    projection.update({"id": 1, "created_at": 1, "canton": 1, "schema_version": 1, "_id": 0})
+    return projection
+
+# Listing fast path - documents become response dicts directly instead of going through
+# an Excursion model and FastAPI's response validation
+EXCURSION_LISTING_PROJECTION = {field: 1 for field in Excursion.model_fields}
+EXCURSION_LISTING_PROJECTION.update({"canton": 1, "schema_version": 1, "_id": 0})
+
+def json_ready_excursion(doc: dict) -> dict:
+    """Match pydantic's JSON output for the fields stored differently in Mongo"""
+    created_at = doc.get("created_at")
+    if isinstance(created_at, str) and created_at.endswith("+00:00"):
+        doc["created_at"] = created_at[:-6] + "Z"
+    if isinstance(doc.get("average_rating"), int):
+        doc["average_rating"] = float(doc["average_rating"])
+    return doc
+
+def excursion_listing_dict(doc: dict) -> dict:
+    """Full Excursion-shaped dict for a document fetched with EXCURSION_LISTING_PROJECTION"""
+    upgrade_legacy_excursion(doc)
+    result = {}
+    for name, field in Excursion.model_fields.items():
+        if name in doc:
+            result[name] = doc[name]
+        elif not field.is_required():
+            result[name] = field.get_default(call_default_factory=True)
+    return json_ready_excursion(result)
+
 # Password and JWT utilities
 def hash_password(password: str) -> str:
     """Hash password using bcrypt"""
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
     return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
 
 def verify_password(password: str, hashed: str) -> bool:
     """Verify password against hash"""
-    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+    try:
+        return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+    except ValueError:
+        # Missing or malformed hash
+        return False
+
+def password_needs_rehash(hashed: str) -> bool:
+    """Check whether a stored hash was made with a different cost factor than BCRYPT_ROUNDS"""
+    try:
+        return int(hashed.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
+
+# bcrypt releases the GIL, so a small thread pool keeps hashing off the event loop
+password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+pending_password_jobs = 0
+Gauge("password_jobs_pending", "Password hash/verify jobs queued or running").set_function(lambda: pending_password_jobs)
+
+async def run_password_job(func, *args):
+    """Run a bcrypt call on the password pool, shedding load once too many are queued"""
+    global pending_password_jobs
+    if pending_password_jobs >= PASSWORD_HASH_MAX_PENDING:
+        raise HTTPException(status_code=503, detail="Server busy, please try again", headers={"Retry-After": "1"})
+
+    pending_password_jobs += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(password_executor, func, *args)
+    finally:
+        pending_password_jobs -= 1
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create JWT access token"""
@@ -337,7 +913,7 @@ async def register_user(user_data: UserCreate):
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Create new user
-    hashed_password = hash_password(user_data.password)
+    hashed_password = await run_password_job(hash_password, user_data.password)
     user = User(
         email=user_data.email,
         name=user_data.name,
@@ -348,7 +924,11 @@ async def register_user(user_data: UserCreate):
     # Store user with hashed password
     user_dict = prepare_for_mongo(user.dict())
     user_dict["password_hash"] = hashed_password
-    await db.users.insert_one(user_dict)
+    try:
+        await db.users.insert_one(user_dict)
+    except DuplicateKeyError:
+        # Registered concurrently while the password was being hashed; email_unique caught it
+        raise HTTPException(status_code=400, detail="Email already registered")
     
     # Create JWT token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -385,8 +965,14 @@ async def login_user(credentials: UserLogin):
         raise HTTPException(status_code=401, detail="Invalid email or password")
     
     # Verify password
-    if not verify_password(credentials.password, user_doc.get("password_hash", "")):
+    password_hash = user_doc.get("password_hash", "")
+    if not await run_password_job(verify_password, credentials.password, password_hash):
         raise HTTPException(status_code=401, detail="Invalid email or password")
+
+    # Upgrade hashes made with an older cost factor while we have the plaintext
+    if password_needs_rehash(password_hash):
+        new_hash = await run_password_job(hash_password, credentials.password)
+        await db.users.update_one({"id": user_doc["id"]}, {"$set": {"password_hash": new_hash}})
     
     user = User(**user_doc)
     
@@ -417,6 +1003,124 @@ async def login_user(credentials: UserLogin):
     
     return response
 
+# OAuth provider client
+class CircuitBreaker:
+    """Fail fast while an upstream keeps failing, then let a single trial request through after a cooldown"""
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_started_at: Optional[float] = None
+
+    def allow_request(self) -> bool:
+        if self.opened_at is None:
+            return True
+        now = time.monotonic()
+        if now - self.opened_at < self.reset_seconds:
+            return False
+        if self.trial_started_at is not None and now - self.trial_started_at < self.reset_seconds:
+            # Half-open with the trial still running - everyone else keeps failing fast. A trial that
+            # never reported back (e.g. a cancelled request) stops blocking after reset_seconds
+            return False
+        # Half-open: this caller is the trial, its outcome decides whether we close again
+        self.trial_started_at = now
+        return True
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_started_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        self.trial_started_at = None
+        if self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+auth_http_client = httpx.AsyncClient(
+    base_url=AUTH_PROVIDER_URL,
+    timeout=httpx.Timeout(AUTH_PROVIDER_READ_TIMEOUT, connect=AUTH_PROVIDER_CONNECT_TIMEOUT),
+    limits=httpx.Limits(max_connections=20, max_keepalive_connections=10)
+)
+auth_provider_breaker = CircuitBreaker(AUTH_PROVIDER_FAILURE_THRESHOLD, AUTH_PROVIDER_RESET_SECONDS)
+
+async def fetch_oauth_session_data(session_id: str) -> dict:
+    """Exchange an OAuth session ID for the user's session data at the auth provider"""
+    if not auth_provider_breaker.allow_request():
+        raise HTTPException(status_code=503, detail="Authentication provider unavailable")
+
+    for attempt in range(AUTH_PROVIDER_RETRIES + 1):
+        try:
+            response = await auth_http_client.get(
+                "/auth/v1/env/oauth/session-data",
+                headers={"X-Session-ID": session_id}
+            )
+        except httpx.TransportError:
+            response = None
+
+        if response is not None and response.status_code < 500:
+            # The provider answered - a 4xx means the session itself is bad
+            auth_provider_breaker.record_success()
+            if response.status_code != 200:
+                raise HTTPException(status_code=400, detail="Invalid session")
+            try:
+                return response.json()
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid session")
+
+        if attempt < AUTH_PROVIDER_RETRIES:
+            await asyncio.sleep(0.2 * 2 ** attempt)
+
+    auth_provider_breaker.record_failure()
+    raise HTTPException(status_code=502, detail="Authentication provider error")
+
+# Session store - keyed by token hash, dates stored as BSON dates so the TTL index can expire them
+async def create_session(user_id: str, session_token: str):
+    """Store a new session and evict the user's oldest ones beyond MAX_SESSIONS_PER_USER"""
+    now = datetime.now(timezone.utc)
+    session = Session(
+        user_id=user_id,
+        token_hash=hash_token(session_token),
+        expires_at=now + timedelta(days=SESSION_TTL_DAYS),
+        created_at=now
+    )
+    session_dict = session.dict()
+    session_dict["_id"] = session_dict.pop("token_hash")
+    # The provider may hand out the same token again; replacing keeps one session per token
+    await db.sessions.replace_one({"_id": session_dict["_id"]}, session_dict, upsert=True)
+
+    evicted = await db.sessions.find(
+        {"user_id": user_id}, {"_id": 1}
+    ).sort([("created_at", DESCENDING), ("_id", DESCENDING)]).skip(MAX_SESSIONS_PER_USER).to_list(length=None)
+    if evicted:
+        token_hashes = [doc["_id"] for doc in evicted]
+        await db.sessions.delete_many({"_id": {"$in": token_hashes}})
+        for token_hash in token_hashes:
+            user_cache.pop(token_hash)
+
+async def migrate_legacy_sessions():
+    """Rewrite sessions stored with a raw token and ISO-string dates into the hashed, BSON-date form"""
+    # ISO strings from prepare_for_mongo share one format, so they compare chronologically
+    expired = await db.sessions.delete_many({
+        "session_token": {"$exists": True},
+        "expires_at": {"$lt": datetime.now(timezone.utc).isoformat()}
+    })
+    migrated = 0
+    async for legacy in db.sessions.find({"session_token": {"$exists": True}}):
+        legacy = parse_from_mongo(legacy)
+        await db.sessions.replace_one({"_id": hash_token(legacy["session_token"])}, {
+            "id": legacy.get("id", str(uuid.uuid4())),
+            "user_id": legacy["user_id"],
+            "expires_at": legacy["expires_at"],
+            "created_at": legacy.get("created_at", datetime.now(timezone.utc))
+        }, upsert=True)
+        await db.sessions.delete_one({"_id": legacy["_id"]})
+        migrated += 1
+    if expired.deleted_count or migrated:
+        logger.info(f"Sessions: dropped {expired.deleted_count} expired legacy sessions, migrated {migrated}")
+
 # OAuth Login (existing)
 @api_router.post("/auth/profile")
 async def handle_auth_callback(request: Request):
@@ -427,16 +1131,7 @@ async def handle_auth_callback(request: Request):
         raise HTTPException(status_code=400, detail="Session ID required")
     
     # Call Emergent auth API
-    headers = {"X-Session-ID": session_id}
-    try:
-        response = requests.get(
-            "https://demobackend.emergentagent.com/auth/v1/env/oauth/session-data",
-            headers=headers
-        )
-        response.raise_for_status()
-        auth_data = response.json()
-    except Exception as e:
-        raise HTTPException(status_code=400, detail="Invalid session")
+    auth_data = await fetch_oauth_session_data(session_id)
     
     # Create or get user
     user_data = {
@@ -454,20 +1149,15 @@ async def handle_auth_callback(request: Request):
         user = User(**existing_user)
     else:
         user_dict = prepare_for_mongo(user_data)
-        await db.users.insert_one(user_dict)
-        user = User(**user_data)
+        try:
+            await db.users.insert_one(user_dict)
+            user = User(**user_data)
+        except DuplicateKeyError:
+            # A concurrent first login created the account in the meantime
+            user = User(**await db.users.find_one({"email": auth_data["email"]}))
     
     # Create session
-    session_data = {
-        "id": str(uuid.uuid4()),
-        "user_id": user.id,
-        "session_token": auth_data["session_token"],
-        "expires_at": datetime.now(timezone.utc) + timedelta(days=7),
-        "created_at": datetime.now(timezone.utc)
-    }
-    
-    session_dict = prepare_for_mongo(session_data)
-    await db.sessions.insert_one(session_dict)
+    await create_session(user.id, auth_data["session_token"])
     
     # Create response with cookie
     response = JSONResponse({"user": user.dict()})
@@ -478,7 +1168,7 @@ async def handle_auth_callback(request: Request):
         httponly=True,
         secure=True,
         samesite="none",
-        max_age=7 * 24 * 3600  # 7 days
+        max_age=SESSION_TTL_DAYS * 24 * 3600
     )
     
     return response
@@ -487,6 +1177,9 @@ async def handle_auth_callback(request: Request):
 async def logout(current_user: User = Depends(get_current_user)):
     # Remove all sessions for user
     await db.sessions.delete_many({"user_id": current_user.id})
+    # Only this worker's cache; other workers keep serving the session for up to
+    # AUTH_SESSION_CACHE_TTL_SECONDS. JWTs stay valid until they expire either way.
+    user_cache.invalidate_user(current_user.id)
     
     response = JSONResponse({"message": "Logged out successfully"})
     response.delete_cookie(key="session_token", path="/")
@@ -496,9 +1189,489 @@ async def logout(current_user: User = Depends(get_current_user)):
 async def get_me(current_user: User = Depends(get_current_user)):
     return current_user
 
-# Excursion Routes
-@api_router.get("/excursions", response_model=List[Excursion])
-async def get_excursions(
+# Geocoding
+class GeocodingError(Exception):
+    """The geocoder could not give a definite answer (network error, rate limit, bad response)"""
+
+class Geocoder(ABC):
+    """Resolves a free-form address to (lat, lng); subclasses talk to a concrete service"""
+
+    @abstractmethod
+    async def geocode(self, address: str) -> Optional[tuple]:
+        """Coordinates of the address, or None if the service does not know it"""
+
+    async def aclose(self):
+        pass
+
+class NominatimGeocoder(Geocoder):
+    """OpenStreetMap Nominatim search API"""
+
+    def __init__(self, base_url: str, timeout: float):
+        self.http_client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=timeout,
+            headers={"User-Agent": "AusflugFinder/1.0"}
+        )
+
+    async def geocode(self, address: str) -> Optional[tuple]:
+        response = await self.http_client.get(
+            "/search",
+            params={"q": address, "format": "json", "limit": 1, "countrycodes": "ch,de,it,fr,at"}
+        )
+        response.raise_for_status()
+        results = response.json()
+        if not results:
+            return None
+        return float(results[0]["lat"]), float(results[0]["lon"])
+
+    async def aclose(self):
+        await self.http_client.aclose()
+
+class StaticGeocoder(Geocoder):
+    """Local stand-in for tests and offline development, answering from a fixed address table"""
+
+    def __init__(self, coordinates: Dict[str, tuple]):
+        self.coordinates = {normalize_address(address): tuple(latlng) for address, latlng in coordinates.items()}
+
+    async def geocode(self, address: str) -> Optional[tuple]:
+        return self.coordinates.get(normalize_address(address))
+
+def normalize_address(address: str) -> str:
+    """Cache key for an address - case and comma/whitespace spacing do not change the location"""
+    address = unicodedata.normalize("NFKC", address).casefold()
+    return " ".join(address.replace(",", " ").split())
+
+def create_geocoder() -> Optional[Geocoder]:
+    """Build the geocoder selected by the GEOCODER setting"""
+    if GEOCODER == "nominatim":
+        return NominatimGeocoder(GEOCODER_URL, GEOCODER_TIMEOUT)
+    if GEOCODER == "static":
+        coordinates = {}
+        if STATIC_GEOCODER_FILE:
+            with open(STATIC_GEOCODER_FILE, encoding="utf-8") as f:
+                coordinates = json.load(f)
+        return StaticGeocoder(coordinates)
+    return None
+
+geocoder = create_geocoder()
+
+async def lookup_address(address: str) -> Optional[tuple]:
+    """Look up coordinates through the persistent cache, asking the geocoder only on a miss.
+    Raises GeocodingError when the geocoder failed; nothing is cached then."""
+    if geocoder is None:
+        return None
+
+    address_key = normalize_address(address)
+    cached = await db.geocode_cache.find_one({"address_key": address_key})
+    if cached:
+        return (cached["lat"], cached["lng"]) if cached.get("found") else None
+
+    try:
+        result = await geocoder.geocode(address)
+    except Exception as e:
+        raise GeocodingError(str(e)) from e
+
+    # Misses are cached too so unknown addresses are not retried on every save
+    await db.geocode_cache.update_one(
+        {"address_key": address_key},
+        {"$set": {
+            "address_key": address_key,
+            "found": result is not None,
+            "lat": result[0] if result else None,
+            "lng": result[1] if result else None,
+            "created_at": datetime.now(timezone.utc).isoformat()
+        }},
+        upsert=True
+    )
+    return result
+
+async def geocode_address(address: str) -> Optional[tuple]:
+    """Best-effort lookup_address - a failing geocoder just leaves the excursion without coordinates"""
+    try:
+        return await lookup_address(address)
+    except GeocodingError as e:
+        logger.warning(f"Geocoding failed for {address!r}: {e}")
+        return None
+
+def geo_point(lat: Optional[float], lng: Optional[float]) -> Optional[dict]:
+    """GeoJSON point for the 2dsphere index - note GeoJSON orders coordinates (lng, lat)"""
+    if lat is None or lng is None:
+        return None
+    return {"type": "Point", "coordinates": [lng, lat]}
+
+async def resolve_coordinates(excursion_dict: dict, geocode: bool):
+    """Fill lat/lng/location on an excursion dict - client-supplied coordinates win over geocoding"""
+    if (excursion_dict.get('lat') is None) != (excursion_dict.get('lng') is None):
+        raise HTTPException(status_code=400, detail="lat and lng must be given together")
+
+    if excursion_dict.get('lat') is None and geocode:
+        coordinates = await geocode_address(excursion_dict['address'])
+        excursion_dict['lat'], excursion_dict['lng'] = coordinates if coordinates else (None, None)
+
+    excursion_dict['location'] = geo_point(excursion_dict.get('lat'), excursion_dict.get('lng'))
+    excursion_dict['geohash'] = encode_geohash(excursion_dict['lat'], excursion_dict['lng']) if excursion_dict['location'] else None
+
+async def backfill_coordinates():
+    """Geocode excursions saved before coordinates were stored; paced to respect public geocoder limits"""
+    async for excursion in db.excursions.find({"location": {"$exists": False}}, {"id": 1, "address": 1, "lat": 1, "lng": 1}):
+        lat, lng = excursion.get("lat"), excursion.get("lng")
+        if lat is None or lng is None:
+            try:
+                coordinates = await lookup_address(excursion.get("address", ""))
+            except GeocodingError as e:
+                # Left without 'location' so the next backfill tries again
+                logger.warning(f"Geocoding failed for excursion {excursion['id']}, retrying on the next run: {e}")
+                continue
+            finally:
+                await asyncio.sleep(1)
+            lat, lng = coordinates if coordinates else (None, None)
+        await db.excursions.update_one(
+            {"id": excursion["id"]},
+            {"$set": {
+                "lat": lat,
+                "lng": lng,
+                "location": geo_point(lat, lng),
+                "geohash": encode_geohash(lat, lng) if lat is not None else None
+            }}
+        )
+        cluster_index.add(await db.excursions.find_one({"id": excursion["id"]}, CLUSTER_POINT_FIELDS))
+
+# Map clustering
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+CLUSTER_POINT_FIELDS = {"geohash": 1, "lat": 1, "lng": 1, "category": 1, "_id": 0}
+
+def encode_geohash(lat: float, lng: float, precision: int = GEOHASH_PRECISION) -> str:
+    """Standard base32 geohash - cells at precision p nest inside their prefix at p-1"""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        value, value_range = (lng, lng_range) if even else (lat, lat_range)
+        middle = (value_range[0] + value_range[1]) / 2
+        bits <<= 1
+        if value >= middle:
+            bits |= 1
+            value_range[0] = middle
+        else:
+            value_range[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+def geohash_grid(min_lng: float, min_lat: float, max_lng: float, max_lat: float, precision: int) -> tuple:
+    """Column and row ranges of the geohash cells at this precision that intersect the bbox, plus the
+    cell size - longitude gets the extra bit when a geohash has an odd number of bits"""
+    bits = 5 * precision
+    columns, rows = 2 ** ((bits + 1) // 2), 2 ** (bits // 2)
+    cell_lng, cell_lat = 360.0 / columns, 180.0 / rows
+    column_range = range(int((min_lng + 180) // cell_lng), min(int((max_lng + 180) // cell_lng), columns - 1) + 1)
+    row_range = range(int((min_lat + 90) // cell_lat), min(int((max_lat + 90) // cell_lat), rows - 1) + 1)
+    return column_range, row_range, cell_lng, cell_lat
+
+def geohash_cells_covering(min_lng: float, min_lat: float, max_lng: float, max_lat: float, precision: int) -> List[str]:
+    """Every geohash cell at this precision that intersects the bbox"""
+    column_range, row_range, cell_lng, cell_lat = geohash_grid(min_lng, min_lat, max_lng, max_lat, precision)
+    return [
+        encode_geohash(-90 + (row + 0.5) * cell_lat, -180 + (column + 0.5) * cell_lng, precision)
+        for column in column_range
+        for row in row_range
+    ]
+
+def cluster_precision(min_lng: float, min_lat: float, max_lng: float, max_lat: float, zoom: int) -> int:
+    """The zoom's geohash precision, coarsened until the bbox spans at most MAX_CLUSTER_CELLS cells"""
+    precision = ZOOM_TO_GEOHASH_PRECISION[zoom]
+    while precision > 1:
+        column_range, row_range, _, _ = geohash_grid(min_lng, min_lat, max_lng, max_lat, precision)
+        if len(column_range) * len(row_range) <= MAX_CLUSTER_CELLS:
+            break
+        precision -= 1
+    return precision
+
+class ClusterIndex:
+    """Per-zoom cluster tiles keyed by geohash cell, built with one aggregation and then kept current
+    by applying each excursion change as a delta instead of recomputing"""
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._tiles: Dict[int, Dict[str, dict]] = {}
+        self._built_at: Dict[int, float] = {}
+        self._locks: Dict[int, asyncio.Lock] = {}
+
+    async def tiles(self, precision: int) -> Dict[str, dict]:
+        # Rebuild periodically so changes made by other workers show up eventually
+        built_at = self._built_at.get(precision)
+        if built_at is not None and time.monotonic() - built_at < self.ttl_seconds:
+            return self._tiles[precision]
+
+        lock = self._locks.setdefault(precision, asyncio.Lock())
+        async with lock:
+            built_at = self._built_at.get(precision)
+            if built_at is None or time.monotonic() - built_at >= self.ttl_seconds:
+                self._tiles[precision] = await self._build(precision)
+                self._built_at[precision] = time.monotonic()
+        return self._tiles[precision]
+
+    async def _build(self, precision: int) -> Dict[str, dict]:
+        pipeline = [
+            {"$match": {"geohash": {"$type": "string"}}},
+            {"$group": {
+                "_id": {"cell": {"$substrCP": ["$geohash", 0, precision]}, "category": "$category"},
+                "count": {"$sum": 1},
+                "lat_sum": {"$sum": "$lat"},
+                "lng_sum": {"$sum": "$lng"}
+            }}
+        ]
+        tiles = {}
+        async for row in db.excursions.aggregate(pipeline):
+            tile = tiles.setdefault(row["_id"]["cell"], {"count": 0, "lat_sum": 0.0, "lng_sum": 0.0, "categories": {}})
+            tile["count"] += row["count"]
+            tile["lat_sum"] += row["lat_sum"]
+            tile["lng_sum"] += row["lng_sum"]
+            tile["categories"][row["_id"]["category"]] = row["count"]
+        return tiles
+
+    def _apply(self, point: Optional[dict], sign: int):
+        if not point or not point.get("geohash"):
+            return
+        for precision, tiles in self._tiles.items():
+            cell = point["geohash"][:precision]
+            tile = tiles.setdefault(cell, {"count": 0, "lat_sum": 0.0, "lng_sum": 0.0, "categories": {}})
+            tile["count"] += sign
+            tile["lat_sum"] += sign * point["lat"]
+            tile["lng_sum"] += sign * point["lng"]
+            category = point.get("category")
+            tile["categories"][category] = tile["categories"].get(category, 0) + sign
+            if tile["categories"][category] <= 0:
+                del tile["categories"][category]
+            if tile["count"] <= 0:
+                del tiles[cell]
+
+    def add(self, point: Optional[dict]):
+        self._apply(point, 1)
+
+    def remove(self, point: Optional[dict]):
+        self._apply(point, -1)
+
+    def move(self, old_point: Optional[dict], new_point: Optional[dict]):
+        self.remove(old_point)
+        self.add(new_point)
+
+cluster_index = ClusterIndex(CLUSTER_CACHE_TTL_SECONDS)
+
+@api_router.get("/excursions/clusters")
+async def get_excursion_clusters(
+    bbox: str,
+    zoom: int = Query(..., ge=0, le=len(ZOOM_TO_GEOHASH_PRECISION) - 1)
+):
+    min_lng, min_lat, max_lng, max_lat = parse_bbox(bbox)
+    # Only the cells covering the viewport are looked up, and a viewport too wide for the zoom gets
+    # coarser cells, so work and payload stay within MAX_CLUSTER_CELLS whatever the catalogue size
+    precision = cluster_precision(min_lng, min_lat, max_lng, max_lat, zoom)
+    tiles = await cluster_index.tiles(precision)
+
+    clusters = []
+    for cell in geohash_cells_covering(min_lng, min_lat, max_lng, max_lat, precision):
+        tile = tiles.get(cell)
+        if tile is None:
+            continue
+        lat = tile["lat_sum"] / tile["count"]
+        lng = tile["lng_sum"] / tile["count"]
+        if min_lat <= lat <= max_lat and min_lng <= lng <= max_lng:
+            clusters.append({
+                "geohash": cell,
+                "count": tile["count"],
+                "lat": lat,
+                "lng": lng,
+                "categories": dict(tile["categories"])
+            })
+    return clusters
+
+# Autocomplete
+def fold_for_prefix(text: str) -> str:
+    """Case- and accent-insensitive form used for prefix matching ("zur" finds "Zürich")"""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return " ".join("".join(c for c in decomposed if not unicodedata.combining(c)).split())
+
+class PrefixIndex:
+    """Sorted arrays of folded keys searched with bisect, one per payload kind; every word start of
+    a label is a key, so both "blau" and "rund" find "Blausee Rundweg"
+    """
+
+    def __init__(self):
+        self._keys: Dict[str, List[tuple]] = {}
+        self._entries: Dict[tuple, tuple] = {}
+
+    @staticmethod
+    def _label_keys(entry_key: tuple, label: str) -> List[tuple]:
+        words = fold_for_prefix(label).split(" ")
+        return [(" ".join(words[i:]), entry_key) for i in range(len(words))]
+
+    def load(self, entries):
+        """Bulk-load (entry_key, label, payload) triples; the key arrays are sorted once at the end
+        instead of paying an O(n) insort per key"""
+        for entry_key, label, payload in entries:
+            self.remove(entry_key)
+            keys = self._label_keys(entry_key, label)
+            self._keys.setdefault(payload["kind"], []).extend(keys)
+            self._entries[entry_key] = (payload, keys)
+        for keys in self._keys.values():
+            keys.sort()
+
+    def add(self, entry_key: tuple, label: str, payload: dict):
+        self.remove(entry_key)
+        keys = self._label_keys(entry_key, label)
+        kind_keys = self._keys.setdefault(payload["kind"], [])
+        for key in keys:
+            bisect.insort(kind_keys, key)
+        self._entries[entry_key] = (payload, keys)
+
+    def remove(self, entry_key: tuple):
+        entry = self._entries.pop(entry_key, None)
+        if entry is None:
+            return
+        payload, keys = entry
+        kind_keys = self._keys[payload["kind"]]
+        for key in keys:
+            position = bisect.bisect_left(kind_keys, key)
+            if position < len(kind_keys) and kind_keys[position] == key:
+                del kind_keys[position]
+
+    def _iter_kind(self, kind_keys: List[tuple], prefix: str):
+        position = bisect.bisect_left(kind_keys, (prefix,))
+        while position < len(kind_keys):
+            key = kind_keys[position]
+            if not key[0].startswith(prefix):
+                break
+            position += 1
+            yield key
+
+    def iter_matches(self, prefix: str, kinds: Optional[set] = None):
+        """Payloads of every key starting with the folded prefix, in key order; only the arrays of
+        the requested kinds are scanned"""
+        prefix = fold_for_prefix(prefix)
+        arrays = [keys for kind, keys in self._keys.items() if not kinds or kind in kinds]
+        for _, entry_key in heapq.merge(*(self._iter_kind(keys, prefix) for keys in arrays)):
+            yield self._entries[entry_key][0]
+
+    def search(self, prefix: str, limit: int, kinds: Optional[set] = None) -> List[dict]:
+        results, seen = [], set()
+        for payload in self.iter_matches(prefix, kinds):
+            if len(results) >= limit:
+                break
+            dedupe_key = (payload["kind"], payload["label"])
+            if dedupe_key in seen:
+                continue
+            seen.add(dedupe_key)
+            results.append(payload)
+        return results
+
+class AutocompleteIndex(PrefixIndex):
+    """Prefix index over excursion titles and addresses plus the static country/region enums"""
+
+    @staticmethod
+    def excursion_entries(excursion: dict):
+        yield (("title", excursion["id"]), excursion["title"],
+               {"kind": "title", "label": excursion["title"], "excursion_id": excursion["id"]})
+        yield (("place", excursion["id"]), excursion["address"],
+               {"kind": "place", "label": excursion["address"], "excursion_id": excursion["id"]})
+
+    def add_excursion(self, excursion: dict):
+        for entry in self.excursion_entries(excursion):
+            self.add(*entry)
+
+    def remove_excursion(self, excursion_id: str):
+        self.remove(("title", excursion_id))
+        self.remove(("place", excursion_id))
+
+    def matching_excursion_ids(self, prefix: str, limit: int) -> List[str]:
+        """Excursions whose title or address contains a word starting with the prefix - catches partial
+        input such as "Blau" or "Zür" that the word-based text index cannot"""
+        ids = {}
+        for payload in self.iter_matches(prefix, {"title", "place"}):
+            ids[payload["excursion_id"]] = None
+            if len(ids) >= limit:
+                break
+        return list(ids)
+
+    @staticmethod
+    def reference_data_entries():
+        for country in Country:
+            yield (("country", country.name), country.value,
+                   {"kind": "country", "label": country.value, "value": country.name})
+            for region_key, region_label in get_region_options_for_country(country.value):
+                yield (("region", country.name, region_key), region_label,
+                       {"kind": "region", "label": region_label, "value": region_key, "country": country.value})
+
+    @classmethod
+    def from_excursions(cls, excursions: List[dict]) -> "AutocompleteIndex":
+        index = cls()
+        index.load(itertools.chain(
+            cls.reference_data_entries(),
+            *(cls.excursion_entries(excursion) for excursion in excursions)
+        ))
+        return index
+
+async def build_autocomplete_index() -> AutocompleteIndex:
+    """Fresh index from one pass over the excursions; the CPU-bound build runs in a thread so
+    startup and refreshes don't stall the event loop"""
+    excursions = [
+        excursion async for excursion in db.excursions.find({}, {"id": 1, "title": 1, "address": 1, "_id": 0})
+        if excursion.get("title") and excursion.get("address")
+    ]
+    return await asyncio.to_thread(AutocompleteIndex.from_excursions, excursions)
+
+autocomplete_index = AutocompleteIndex()
+# Edits made while a rebuild is running; the build may have read the excursions before them
+autocomplete_edits: Optional[List[tuple]] = None
+
+def autocomplete_add_excursion(excursion: dict):
+    autocomplete_index.add_excursion(excursion)
+    if autocomplete_edits is not None:
+        autocomplete_edits.append(("add_excursion", excursion))
+
+def autocomplete_remove_excursion(excursion_id: str):
+    autocomplete_index.remove_excursion(excursion_id)
+    if autocomplete_edits is not None:
+        autocomplete_edits.append(("remove_excursion", excursion_id))
+
+async def rebuild_autocomplete_index():
+    """Build a fresh index and replay the edits made meanwhile onto it before it replaces the live one"""
+    global autocomplete_index, autocomplete_edits
+    autocomplete_edits = []
+    try:
+        index = await build_autocomplete_index()
+        # No await from here on, so no edit can slip in between the replay and the swap
+        for method, argument in autocomplete_edits:
+            getattr(index, method)(argument)
+        autocomplete_index = index
+    finally:
+        autocomplete_edits = None
+
+async def refresh_autocomplete_index():
+    """Rebuild periodically so edits made through other workers are picked up"""
+    while True:
+        try:
+            await rebuild_autocomplete_index()
+        except Exception:
+            logger.exception("Could not rebuild autocomplete index")
+        await asyncio.sleep(AUTOCOMPLETE_REFRESH_SECONDS)
+
+@api_router.get("/autocomplete")
+async def autocomplete(
+    q: str = Query(..., min_length=1, max_length=100),
+    kind: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=MAX_AUTOCOMPLETE_RESULTS)
+):
+    kinds = set(kind.split(",")) if kind else None
+    return autocomplete_index.search(q, limit, kinds)
+
+# Facets
+facet_cache = TTLCache(FACET_CACHE_MAX_ENTRIES, FACET_CACHE_TTL_SECONDS)
+
+@api_router.get("/excursions/facets")
+async def get_excursion_facets(
     country: Optional[str] = None,
     region: Optional[str] = None,
     category: Optional[Category] = None,
@@ -506,6 +1679,59 @@ async def get_excursions(
     is_outdoor: Optional[bool] = None,
     has_grill: Optional[bool] = None
 ):
+    query = build_excursion_filter(country, region, category, is_free, is_outdoor, has_grill)
+    cache_key = tuple(sorted(query.items()))
+    cached = facet_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # Each dimension is counted under every filter except its own, so the sidebar still shows
+    # the alternatives to the value that is currently selected
+    facets = {}
+    for field in FACET_FIELDS:
+        facet_query = {key: value for key, value in query.items() if key != field}
+        facets[field] = [
+            {"$match": facet_query},
+            {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1, "_id": 1}}
+        ]
+    facets["total"] = [{"$match": query}, {"$count": "count"}]
+
+    result = await db.excursions.aggregate([{"$facet": facets}]).to_list(length=1)
+    total = result[0].pop("total")
+    counts = {
+        field: [{"value": row["_id"], "count": row["count"]} for row in rows if row["_id"] is not None]
+        for field, rows in result[0].items()
+    }
+    # Number of excursions matching every filter, for "N results" without loading them all
+    counts["total"] = total[0]["count"] if total else 0
+    facet_cache.put(cache_key, counts)
+    return counts
+
+@api_router.get("/stats")
+async def get_stats():
+    cached = facet_cache.get("stats")
+    if cached is not None:
+        return cached
+
+    result = await db.excursions.aggregate([
+        {"$group": {"_id": None, "excursions": {"$sum": 1}, "categories": {"$addToSet": "$category"}, "authors": {"$addToSet": "$author_id"}}},
+        {"$project": {"_id": 0, "excursions": 1, "categories": {"$size": "$categories"}, "authors": {"$size": "$authors"}}}
+    ]).to_list(length=1)
+    stats = result[0] if result else {"excursions": 0, "categories": 0, "authors": 0}
+    facet_cache.put("stats", stats)
+    return stats
+
+# Excursion Routes
+def build_excursion_filter(
+    country: Optional[str] = None,
+    region: Optional[str] = None,
+    category: Optional[str] = None,
+    is_free: Optional[bool] = None,
+    is_outdoor: Optional[bool] = None,
+    has_grill: Optional[bool] = None
+) -> dict:
+    """Mongo query for the filter parameters shared by the excursion listing endpoints"""
     query = {}
     if country:
         query["country"] = country
@@ -519,45 +1745,201 @@ async def get_excursions(
         query["is_outdoor"] = is_outdoor
     if has_grill is not None:
         query["has_grill"] = has_grill
-    
-    excursions = await db.excursions.find(query).sort("created_at", -1).to_list(length=None)
-    
-    # Handle backward compatibility - convert old canton field to new country/region format
-    processed_excursions = []
-    for exc in excursions:
-        # Migrate old format to new format if needed
-        if "canton" in exc and "country" not in exc:
-            exc["country"] = "Schweiz"  # Old data was Switzerland only
-            exc["region"] = exc.get("canton", "")
-        
-        # Ensure required fields exist
-        if "country" not in exc:
-            exc["country"] = "Schweiz"
-        if "region" not in exc:
-            exc["region"] = exc.get("canton", "Zürich")
-            
-        processed_excursions.append(Excursion(**exc))
-    
-    return processed_excursions
+    return query
+
+def parse_bbox(bbox: str) -> tuple:
+    """Parse a 'min_lng,min_lat,max_lng,max_lat' viewport"""
+    try:
+        min_lng, min_lat, max_lng, max_lat = (float(value) for value in bbox.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox must be min_lng,min_lat,max_lng,max_lat")
+    if not (-180 <= min_lng < max_lng <= 180 and -90 <= min_lat < max_lat <= 90):
+        raise HTTPException(status_code=400, detail="Invalid bbox")
+    return min_lng, min_lat, max_lng, max_lat
+
+@api_router.get("/excursions/geo", response_model=List[ExcursionWithDistance])
+async def search_excursions_geo(
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lng: Optional[float] = Query(None, ge=-180, le=180),
+    radius_km: Optional[float] = Query(None, gt=0, le=MAX_GEO_RADIUS_KM),
+    bbox: Optional[str] = None,
+    country: Optional[str] = None,
+    region: Optional[str] = None,
+    category: Optional[Category] = None,
+    is_free: Optional[bool] = None,
+    is_outdoor: Optional[bool] = None,
+    has_grill: Optional[bool] = None,
+    limit: int = Query(MAX_GEO_RESULTS, ge=1, le=MAX_GEO_RESULTS),
+    fields: Optional[str] = None
+):
+    query = build_excursion_filter(country, region, category, is_free, is_outdoor, has_grill)
+    geo_near = {"key": "location", "distanceField": "distance_km", "distanceMultiplier": 0.001, "spherical": True}
+
+    if bbox:
+        # Viewport search, ordered by distance from the viewport centre
+        min_lng, min_lat, max_lng, max_lat = parse_bbox(bbox)
+        query["location"] = {"$geoWithin": {"$geometry": {"type": "Polygon", "coordinates": [[
+            [min_lng, min_lat], [max_lng, min_lat], [max_lng, max_lat], [min_lng, max_lat], [min_lng, min_lat]
+        ]]}}}
+        geo_near["near"] = geo_point((min_lat + max_lat) / 2, (min_lng + max_lng) / 2)
+    elif lat is not None and lng is not None and radius_km:
+        geo_near["near"] = geo_point(lat, lng)
+        geo_near["maxDistance"] = radius_km * 1000
+    else:
+        raise HTTPException(status_code=400, detail="Provide either bbox or lat, lng and radius_km")
+
+    geo_near["query"] = query
+    pipeline = [{"$geoNear": geo_near}, {"$limit": limit}]
+
+    projection = build_excursion_projection(fields)
+    if projection is not None:
+        # Aggregation spells the first-photo slice differently than find()
+        if isinstance(projection.get("photos"), dict):
+            projection["photos"] = {"$slice": ["$photos", 1]}
+        projection["distance_km"] = 1
+        pipeline.append({"$project": projection})
+
+    excursions = await db.excursions.aggregate(pipeline).to_list(length=limit)
+
+    if projection is not None:
+        excursions = [finish_projected_excursion(exc, projection) for exc in excursions]
+        return JSONResponse(jsonable_encoder(excursions))
+
+    return [ExcursionWithDistance(**upgrade_legacy_excursion(exc)) for exc in excursions]
+
+@api_router.get("/excursions/search", response_model=List[ExcursionSearchResult])
+async def search_excursions(
+    q: str = Query(..., min_length=2, max_length=200),
+    country: Optional[str] = None,
+    region: Optional[str] = None,
+    category: Optional[Category] = None,
+    is_free: Optional[bool] = None,
+    is_outdoor: Optional[bool] = None,
+    has_grill: Optional[bool] = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None
+):
+    # The text index stems German and ignores diacritics, so "Zurich" finds "Zürich". It only matches
+    # whole words, so excursions with a title/address word starting with the input come from the prefix
+    # index in a second query. Both are ranked, merged and cut to the page here: a textScore is only
+    # defined for documents matched by $text, so the two can't share one $or pipeline
+    query = build_excursion_filter(country, region, category, is_free, is_outdoor, has_grill)
+    prefix_ids = autocomplete_index.matching_excursion_ids(q, MAX_PREFIX_MATCHES)
+    window = offset + limit
+
+    projection = build_excursion_projection(fields)
+    if projection is not None:
+        if isinstance(projection.get("photos"), dict):
+            projection["photos"] = {"$slice": ["$photos", 1]}
+        projection["relevance"] = 1
+
+    def ranked_pipeline(match: dict, score) -> list:
+        pipeline = [
+            {"$match": match},
+            {"$addFields": {"relevance": {"$multiply": [
+                score,
+                {"$add": [1, {"$multiply": [SEARCH_RATING_WEIGHT, {"$divide": [{"$ifNull": ["$average_rating", 0]}, 5]}]}]}
+            ]}}},
+            {"$sort": {"relevance": -1, "id": 1}},
+            {"$limit": window}
+        ]
+        if projection is not None:
+            pipeline.append({"$project": projection})
+        return pipeline
+
+    text_matches = await db.excursions.aggregate(
+        ranked_pipeline({**query, "$text": {"$search": q}}, {"$meta": "textScore"})
+    ).to_list(length=window)
+    prefix_matches = []
+    if prefix_ids:
+        prefix_matches = await db.excursions.aggregate(
+            ranked_pipeline({**query, "id": {"$in": prefix_ids}}, PREFIX_MATCH_SCORE)
+        ).to_list(length=window)
+
+    merged = {exc["id"]: exc for exc in text_matches}
+    for exc in prefix_matches:
+        if exc["id"] in merged:
+            merged[exc["id"]]["relevance"] += exc["relevance"]
+        else:
+            merged[exc["id"]] = exc
+    excursions = sorted(merged.values(), key=lambda exc: (-exc["relevance"], exc["id"]))[offset:window]
+
+    if projection is not None:
+        excursions = [finish_projected_excursion(exc, projection) for exc in excursions]
+        return JSONResponse(jsonable_encoder(excursions))
+
+    return [ExcursionSearchResult(**upgrade_legacy_excursion(exc)) for exc in excursions]
+
+@api_router.get("/excursions", response_model=List[Excursion])
+async def get_excursions(
+    country: Optional[str] = None,
+    region: Optional[str] = None,
+    category: Optional[Category] = None,
+    is_free: Optional[bool] = None,
+    is_outdoor: Optional[bool] = None,
+    has_grill: Optional[bool] = None,
+    author_id: Optional[str] = None,
+    sort: str = Query("newest", pattern="^(newest|rating)$"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None
+):
+    query = build_excursion_filter(country, region, category, is_free, is_outdoor, has_grill)
+    if author_id:
+        query["author_id"] = author_id
+    if sort == "rating":
+        # Top-rated lists are short; keyset paging is only offered on the newest-first order
+        if cursor:
+            raise HTTPException(status_code=400, detail="cursor is only supported with sort=newest")
+        order = RATING_SORT
+    else:
+        order = LISTING_SORT
+        if cursor:
+            query.update(keyset_filter(cursor))
+
+    projection = build_excursion_projection(fields)
+
+    find_projection = projection if projection is not None else EXCURSION_LISTING_PROJECTION
+    excursions_cursor = db.excursions.find(query, find_projection).sort(order).limit(limit)
+    with trace_span("mongo.find", **{"db.collection": "excursions", "db.operation": "find"}) as span:
+        excursions = await excursions_cursor.to_list(length=limit)
+        span.set_attribute("db.documents", len(excursions))
+
+    next_cursor = None
+    if sort == "newest" and len(excursions) == limit:
+        last = excursions[-1]
+        next_cursor = encode_cursor(last.get("created_at"), last["id"])
+
+    # Documents not yet migrated get the legacy fallback; everything else passes straight through
+    with trace_span("compat.patch"):
+        if projection is not None:
+            processed_excursions = [json_ready_excursion(finish_projected_excursion(exc, projection)) for exc in excursions]
+        else:
+            processed_excursions = [excursion_listing_dict(exc) for exc in excursions]
+
+    # Serialized straight to bytes - the dicts already match the Excursion schema, so FastAPI's
+    # response_model validation and the stdlib encoder are skipped
+    with trace_span("serialize.json"):
+        body = orjson.dumps(processed_excursions, option=orjson.OPT_UTC_Z)
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return Response(body, media_type="application/json", headers=headers)
 
 @api_router.get("/excursions/{excursion_id}", response_model=Excursion)
 async def get_excursion(excursion_id: str):
-    excursion = await db.excursions.find_one({"id": excursion_id})
+    with trace_span("mongo.find", **{"db.collection": "excursions", "db.operation": "find_one"}):
+        excursion = await db.excursions.find_one({"id": excursion_id})
     if not excursion:
         raise HTTPException(status_code=404, detail="Excursion not found")
     
-    # Handle backward compatibility - convert old canton field to new country/region format
-    if "canton" in excursion and "country" not in excursion:
-        excursion["country"] = "Schweiz"  # Old data was Switzerland only
-        excursion["region"] = excursion.get("canton", "")
-    
-    # Ensure required fields exist
-    if "country" not in excursion:
-        excursion["country"] = "Schweiz"
-    if "region" not in excursion:
-        excursion["region"] = excursion.get("canton", "Zürich")
-        
-    return Excursion(**excursion)
+    with trace_span("compat.patch"):
+        excursion = upgrade_legacy_excursion(excursion)
+    with trace_span("pydantic.construct"):
+        excursion = Excursion(**excursion)
+    # Encoded here rather than by FastAPI, which would validate the model a second time
+    with trace_span("serialize.json"):
+        body = excursion.model_dump_json()
+    return Response(body, media_type="application/json")
 
 @api_router.post("/excursions", response_model=Excursion)
 async def create_excursion(
@@ -565,47 +1947,7 @@ async def create_excursion(
     current_user: User = Depends(get_current_user)
 ):
     # Convert and validate frontend data
-    excursion_dict = excursion_data.dict()
-    
-    # Validate country
-    country_map = {country.name: country.value for country in Country}
-    country_reverse_map = {country.value: country.value for country in Country}
-    
-    if excursion_dict['country'] in country_map:
-        excursion_dict['country'] = country_map[excursion_dict['country']]
-    elif excursion_dict['country'] not in country_reverse_map:
-        raise HTTPException(status_code=400, detail=f"Invalid country: {excursion_dict['country']}")
-    
-    # Validate region based on country
-    valid_regions = get_region_options_for_country(excursion_dict['country'])
-    region_values = [region[1] for region in valid_regions]  # Get values
-    region_keys = [region[0] for region in valid_regions]    # Get keys
-    
-    if excursion_dict['region'] not in region_values and excursion_dict['region'] not in region_keys:
-        raise HTTPException(status_code=400, detail=f"Invalid region for country {excursion_dict['country']}: {excursion_dict['region']}")
-    
-    # Convert region key to value if needed
-    if excursion_dict['region'] in region_keys:
-        region_index = region_keys.index(excursion_dict['region'])
-        excursion_dict['region'] = valid_regions[region_index][1]
-    
-    # Map category keys to values  
-    category_map = {category.name: category.value for category in Category}
-    category_reverse_map = {category.value: category.value for category in Category}
-    
-    if excursion_dict['category'] in category_map:
-        excursion_dict['category'] = category_map[excursion_dict['category']]
-    elif excursion_dict['category'] not in category_reverse_map:
-        raise HTTPException(status_code=400, detail=f"Invalid category: {excursion_dict['category']}")
-        
-    # Map parking situation keys to values
-    parking_map = {parking.name: parking.value for parking in ParkingSituation}
-    parking_reverse_map = {parking.value: parking.value for parking in ParkingSituation}
-    
-    if excursion_dict['parking_situation'] in parking_map:
-        excursion_dict['parking_situation'] = parking_map[excursion_dict['parking_situation']]
-    elif excursion_dict['parking_situation'] not in parking_reverse_map:
-        raise HTTPException(status_code=400, detail=f"Invalid parking situation: {excursion_dict['parking_situation']}")
+    excursion_dict = normalize_excursion_input(excursion_data)
     
     excursion = Excursion(
         **excursion_dict,
@@ -614,7 +1956,13 @@ async def create_excursion(
     )
     
     excursion_dict = prepare_for_mongo(excursion.dict())
+    excursion_dict['schema_version'] = CURRENT_SCHEMA_VERSION
+    await resolve_coordinates(excursion_dict, geocode=True)
+    excursion.lat, excursion.lng = excursion_dict['lat'], excursion_dict['lng']
     await db.excursions.insert_one(excursion_dict)
+    cluster_index.add(excursion_dict)
+    autocomplete_add_excursion(excursion_dict)
+    facet_cache.clear()
     return excursion
 
 @api_router.put("/excursions/{excursion_id}", response_model=Excursion)
@@ -632,68 +1980,27 @@ async def update_excursion(
         raise HTTPException(status_code=403, detail="Not authorized to update this excursion")
     
     # Convert and validate frontend data
-    excursion_dict = excursion_data.dict()
-    
-    # Validate country
-    country_map = {country.name: country.value for country in Country}
-    country_reverse_map = {country.value: country.value for country in Country}
-    
-    if excursion_dict['country'] in country_map:
-        excursion_dict['country'] = country_map[excursion_dict['country']]
-    elif excursion_dict['country'] not in country_reverse_map:
-        raise HTTPException(status_code=400, detail=f"Invalid country: {excursion_dict['country']}")
-    
-    # Validate region based on country
-    valid_regions = get_region_options_for_country(excursion_dict['country'])
-    region_values = [region[1] for region in valid_regions]  # Get values
-    region_keys = [region[0] for region in valid_regions]    # Get keys
-    
-    if excursion_dict['region'] not in region_values and excursion_dict['region'] not in region_keys:
-        raise HTTPException(status_code=400, detail=f"Invalid region for country {excursion_dict['country']}: {excursion_dict['region']}")
-    
-    # Convert region key to value if needed
-    if excursion_dict['region'] in region_keys:
-        region_index = region_keys.index(excursion_dict['region'])
-        excursion_dict['region'] = valid_regions[region_index][1]
-    
-    # Map category keys to values  
-    category_map = {category.name: category.value for category in Category}
-    category_reverse_map = {category.value: category.value for category in Category}
-    
-    if excursion_dict['category'] in category_map:
-        excursion_dict['category'] = category_map[excursion_dict['category']]
-    elif excursion_dict['category'] not in category_reverse_map:
-        raise HTTPException(status_code=400, detail=f"Invalid category: {excursion_dict['category']}")
-        
-    # Map parking situation keys to values
-    parking_map = {parking.name: parking.value for parking in ParkingSituation}
-    parking_reverse_map = {parking.value: parking.value for parking in ParkingSituation}
-    
-    if excursion_dict['parking_situation'] in parking_map:
-        excursion_dict['parking_situation'] = parking_map[excursion_dict['parking_situation']]
-    elif excursion_dict['parking_situation'] not in parking_reverse_map:
-        raise HTTPException(status_code=400, detail=f"Invalid parking situation: {excursion_dict['parking_situation']}")
+    excursion_dict = normalize_excursion_input(excursion_data)
     
+    # Geocode again only when the address moved or was never resolved
+    address_changed = excursion_dict['address'] != existing_excursion.get('address')
+    if excursion_dict.get('lat') is None and not address_changed and existing_excursion.get('lat') is not None:
+        excursion_dict['lat'], excursion_dict['lng'] = existing_excursion['lat'], existing_excursion['lng']
+    await resolve_coordinates(excursion_dict, geocode=True)
+
     # Update excursion in database
     await db.excursions.update_one(
         {"id": excursion_id},
         {"$set": excursion_dict}
     )
     
-    # Return updated excursion with backward compatibility
+    # Return updated excursion
     updated_excursion = await db.excursions.find_one({"id": excursion_id})
+    cluster_index.move(existing_excursion, updated_excursion)
+    autocomplete_add_excursion(updated_excursion)
+    facet_cache.clear()
     
-    # Handle backward compatibility for the response
-    if "canton" in updated_excursion and "country" not in updated_excursion:
-        updated_excursion["country"] = "Schweiz"
-        updated_excursion["region"] = updated_excursion.get("canton", "")
-    
-    if "country" not in updated_excursion:
-        updated_excursion["country"] = "Schweiz"
-    if "region" not in updated_excursion:
-        updated_excursion["region"] = updated_excursion.get("canton", "Zürich")
-        
-    return Excursion(**updated_excursion)
+    return Excursion(**upgrade_legacy_excursion(updated_excursion))
 
 @api_router.delete("/excursions/{excursion_id}")
 async def delete_excursion(
@@ -708,50 +2015,591 @@ async def delete_excursion(
     if excursion["author_id"] != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to delete this excursion")
     
-    # Delete all reviews for this excursion
-    await db.reviews.delete_many({"excursion_id": excursion_id})
-    
-    # Delete the excursion
-    await db.excursions.delete_one({"id": excursion_id})
+    async def delete_excursion_documents(session):
+        # Excursion first, so a standalone server failing midway never shows an excursion missing its reviews.
+        # The photo list is taken from the deleted document, which includes uploads that raced with this request.
+        deleted = await db.excursions.find_one_and_delete({"id": excursion_id}, {"photos": 1}, session=session)
+        if deleted is None:
+            return
+        await db.reviews.delete_many({"excursion_id": excursion_id}, session=session)
+        for photo_name in deleted.get("photos", []):
+            if is_safe_photo_name(photo_name):
+                await release_photo(photo_name, session=session)
+
+    await run_transaction(delete_excursion_documents)
+    photo_cleanup_wakeup.set()
+    cluster_index.remove(excursion)
+    autocomplete_remove_excursion(excursion_id)
+    facet_cache.clear()
     
     return {"message": "Excursion deleted successfully"}
 
+# Photo upload utilities
+def detect_image_format(header: bytes) -> Optional[str]:
+    """Detect the image format from its magic bytes, returning the file extension to store it under"""
+    if header.startswith(b"\xff\xd8\xff"):
+        return "jpg"
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if header[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+def is_content_addressed(photo_name: str) -> bool:
+    """Photos stored since deduplication are named after their SHA-256; older ones after a UUID"""
+    stem = Path(photo_name).stem
+    return len(stem) == 64 and all(c in "0123456789abcdef" for c in stem)
+
+def photo_path(photo_name: str) -> Path:
+    """Location of an original photo - sharded by hash prefix, legacy names flat in UPLOAD_DIR"""
+    if is_content_addressed(photo_name):
+        return UPLOAD_DIR / photo_name[:2] / photo_name[2:4] / photo_name
+    return UPLOAD_DIR / photo_name
+
+async def stream_photo_to_disk(file: UploadFile, byte_budget: int) -> tuple:
+    """Copy an uploaded photo to a temp file in fixed-size chunks, returning (temp_path, format, size, sha256)"""
+    limit = min(MAX_PHOTO_BYTES, byte_budget)
+    temp_path = UPLOAD_DIR / f".{uuid.uuid4()}.part"
+    digest = hashlib.sha256()
+    size = 0
+    image_format = None
+
+    try:
+        async with aiofiles.open(temp_path, 'wb') as f:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                if image_format is None:
+                    image_format = detect_image_format(chunk)
+                    if image_format is None:
+                        raise HTTPException(status_code=400, detail="Only image files allowed")
+                size += len(chunk)
+                if size > limit:
+                    raise HTTPException(status_code=413, detail="Photo too large")
+                digest.update(chunk)
+                await f.write(chunk)
+
+        if image_format is None:
+            raise HTTPException(status_code=400, detail="Empty file")
+    except BaseException:
+        if temp_path.exists():
+            await aiofiles.os.remove(temp_path)
+        raise
+
+    return temp_path, image_format, size, digest.hexdigest()
+
+async def store_photo_blob(temp_path: Path, photo_name: str, size: int) -> bool:
+    """Take a reference on a content-addressed photo, moving the temp file into place only if it is new"""
+    content_hash = Path(photo_name).stem
+    deadline = time.monotonic() + PHOTO_DELETING_WAIT_SECONDS
+    while True:
+        now = datetime.now(timezone.utc)
+        try:
+            previous = await db.photos.find_one_and_update(
+                {"hash": content_hash, "deleting": {"$ne": True}},
+                {
+                    "$inc": {"ref_count": 1},
+                    "$set": {"referenced_at": now},
+                    "$setOnInsert": {"filename": photo_name, "size": size, "created_at": now.isoformat()}
+                },
+                upsert=True,
+                return_document=ReturnDocument.BEFORE
+            )
+            break
+        except DuplicateKeyError:
+            # The cleanup worker holds a 'deleting' record for this photo while it removes the files;
+            # moving the new file into place now would lose it, so wait until the record is gone.
+            # A record older than the job lease was left by a worker that died mid-delete
+            await db.photos.delete_one({
+                "hash": content_hash,
+                "deleting": True,
+                "deleting_since": {"$lt": now - timedelta(seconds=PHOTO_CLEANUP_LEASE_SECONDS)}
+            })
+            if time.monotonic() >= deadline:
+                await aiofiles.os.remove(temp_path)
+                raise HTTPException(
+                    status_code=503,
+                    detail="Photo is being removed, please try again",
+                    headers={"Retry-After": str(max(1, round(PHOTO_DELETING_WAIT_SECONDS)))}
+                )
+            await asyncio.sleep(PHOTO_DELETING_POLL_SECONDS)
+
+    target = photo_path(photo_name)
+    if previous is None or not target.exists():
+        target.parent.mkdir(parents=True, exist_ok=True)
+        await aiofiles.os.replace(temp_path, target)
+        return True
+
+    # Already stored - the upload costs no extra disk space
+    await aiofiles.os.remove(temp_path)
+    return False
+
+async def release_photo(photo_name: str, session=None):
+    """Drop one reference to a stored photo, queueing its files for removal when the last reference goes"""
+    # Legacy UUID-named photos always belong to exactly one excursion
+    if is_content_addressed(photo_name):
+        content_hash = Path(photo_name).stem
+        updated = await db.photos.find_one_and_update(
+            {"hash": content_hash, "ref_count": {"$gt": 0}},
+            {"$inc": {"ref_count": -1}},
+            return_document=ReturnDocument.AFTER,
+            session=session
+        )
+        if not updated or updated["ref_count"] > 0:
+            return
+        # Guarded so a concurrent upload that re-referenced the photo keeps it
+        result = await db.photos.delete_one({"hash": content_hash, "ref_count": 0}, session=session)
+        if not result.deleted_count:
+            return
+    await enqueue_photo_cleanup([photo_name], session=session)
+
+# Photo variant utilities
+def create_photo_process_pool() -> ProcessPoolExecutor:
+    # forkserver workers, since forking this process (Motor, executor and aiofiles threads
+    # already running) is not safe
+    return ProcessPoolExecutor(max_workers=PHOTO_PROCESS_WORKERS, mp_context=multiprocessing.get_context("forkserver"))
+
+photo_process_pool = create_photo_process_pool()
+pending_variant_jobs: Dict[str, asyncio.Task] = {}
+# Photos Pillow could not process; not retried on every page view until the entry expires
+failed_variant_photos = TTLCache(VARIANT_FAILURE_MAX_ENTRIES, VARIANT_FAILURE_TTL_SECONDS)
+
+def variant_path(photo_name: str, variant: str, image_format: str) -> Path:
+    """Location of a resized variant of an uploaded photo"""
+    return VARIANT_DIR / variant_filename(photo_name, variant, image_format)
+
+def is_safe_photo_name(photo_name: str) -> bool:
+    """Reject names that would resolve outside UPLOAD_DIR or hit temp/variant entries"""
+    return Path(photo_name).name == photo_name and not photo_name.startswith(".")
+
+async def generate_variants_in_background(filenames: List[str]):
+    """Hand photos to the process pool so resizing never runs on the event loop"""
+    global photo_process_pool
+    loop = asyncio.get_running_loop()
+    for filename in filenames:
+        pool = photo_process_pool
+        try:
+            await loop.run_in_executor(
+                pool, generate_photo_variants,
+                str(photo_path(filename)), str(VARIANT_DIR), PHOTO_VARIANTS, PHOTO_VARIANT_FORMATS
+            )
+        except BrokenProcessPool:
+            # A worker died - not the photo's fault, so it stays eligible for a retry
+            logger.exception(f"Photo process pool broke while generating variants for {filename}")
+            if photo_process_pool is pool:
+                photo_process_pool = create_photo_process_pool()
+                pool.shutdown(wait=False)
+        except Exception:
+            logger.exception(f"Could not generate variants for {filename}")
+            failed_variant_photos.put(filename, True)
+
+def schedule_variant_generation(photo_name: str):
+    """Generate variants for a photo uploaded before variants existed, at most once at a time"""
+    if photo_name in pending_variant_jobs or failed_variant_photos.get(photo_name):
+        return
+    task = asyncio.create_task(generate_variants_in_background([photo_name]))
+    pending_variant_jobs[photo_name] = task
+    task.add_done_callback(lambda _: pending_variant_jobs.pop(photo_name, None))
+
+async def remove_photo_files(photo_name: str):
+    """Delete an uploaded photo together with all of its variants"""
+    paths = [photo_path(photo_name)] + [
+        variant_path(photo_name, variant, image_format)
+        for variant in PHOTO_VARIANTS
+        for image_format in PHOTO_VARIANT_FORMATS
+    ]
+    for path in paths:
+        try:
+            await aiofiles.os.remove(path)
+        except FileNotFoundError:
+            pass
+
+# Photo cleanup queue - removals are recorded in Mongo alongside the deletes that cause them
+# (inside the same transaction where available) and carried out by a retrying background worker
+photo_cleanup_wakeup = asyncio.Event()
+
+async def enqueue_photo_cleanup(photo_names: List[str], session=None):
+    """Queue photos for file removal; a photo already waiting in the queue is not added twice"""
+    if not photo_names:
+        return
+    now = datetime.now(timezone.utc)
+    await db.photo_cleanup.bulk_write([
+        UpdateOne(
+            {"photo_name": photo_name},
+            {"$setOnInsert": {"photo_name": photo_name, "attempts": 0, "next_attempt_at": now, "created_at": now}},
+            upsert=True
+        )
+        for photo_name in photo_names
+    ], ordered=False, session=session)
+    if session is None:
+        # Inside a transaction the caller wakes the worker once the commit went through
+        photo_cleanup_wakeup.set()
+
+async def claim_photo_cleanup_job() -> Optional[dict]:
+    """Lease the oldest due job; if this worker dies the lease runs out and another one picks it up"""
+    now = datetime.now(timezone.utc)
+    return await db.photo_cleanup.find_one_and_update(
+        {"next_attempt_at": {"$lte": now}},
+        {"$set": {"next_attempt_at": now + timedelta(seconds=PHOTO_CLEANUP_LEASE_SECONDS)}, "$inc": {"attempts": 1}},
+        sort=[("next_attempt_at", ASCENDING)],
+        return_document=ReturnDocument.AFTER
+    )
+
+async def remove_unreferenced_photo(photo_name: str):
+    """Remove a content-addressed photo's files unless it was uploaded again after being queued"""
+    content_hash = Path(photo_name).stem
+    # Claim the hash with a 'deleting' record; store_photo_blob waits while it exists, so a
+    # re-upload can't move its file into place between our check and the removal
+    previous = await db.photos.find_one_and_update(
+        {"hash": content_hash},
+        {"$setOnInsert": {
+            "filename": photo_name, "ref_count": 0, "deleting": True, "deleting_since": datetime.now(timezone.utc)
+        }},
+        upsert=True,
+        return_document=ReturnDocument.BEFORE
+    )
+    if previous is not None and not previous.get("deleting"):
+        # Uploaded again after it was queued - the files are back in use
+        logger.info(f"Skipping cleanup of re-referenced photo {photo_name}")
+        return
+    try:
+        await remove_photo_files(photo_name)
+    finally:
+        await db.photos.delete_one({"hash": content_hash, "deleting": True})
+
+async def run_photo_cleanup_job(job: dict):
+    photo_name = job["photo_name"]
+    try:
+        if is_content_addressed(photo_name):
+            await remove_unreferenced_photo(photo_name)
+        else:
+            await remove_photo_files(photo_name)
+    except Exception as e:
+        delay = min(PHOTO_CLEANUP_RETRY_BASE_SECONDS * 2 ** (job["attempts"] - 1), PHOTO_CLEANUP_RETRY_MAX_SECONDS)
+        logger.warning(f"Cleanup of photo {photo_name} failed (attempt {job['attempts']}), retrying in {delay}s: {e}")
+        await db.photo_cleanup.update_one(
+            {"_id": job["_id"]},
+            {"$set": {"next_attempt_at": datetime.now(timezone.utc) + timedelta(seconds=delay), "last_error": str(e)}}
+        )
+        return
+    await db.photo_cleanup.delete_one({"_id": job["_id"]})
+
+async def process_photo_cleanup_queue():
+    """Drain the cleanup queue, then sleep until woken by a new job or the poll interval passes"""
+    while True:
+        photo_cleanup_wakeup.clear()
+        try:
+            job = await claim_photo_cleanup_job()
+            if job is not None:
+                await run_photo_cleanup_job(job)
+                continue
+        except Exception:
+            logger.exception("Photo cleanup queue unavailable")
+        try:
+            await asyncio.wait_for(photo_cleanup_wakeup.wait(), PHOTO_CLEANUP_POLL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+def scan_photo_storage(min_age_seconds: float) -> tuple:
+    """Walk UPLOAD_DIR and return (original names, variant stems, stale temp files) older than min_age_seconds"""
+    cutoff = time.time() - min_age_seconds
+    originals, variant_stems, stale_temp_files = set(), set(), []
+    for path in UPLOAD_DIR.rglob("*"):
+        if not path.is_file() or path.stat().st_mtime > cutoff:
+            continue
+        if path.name.startswith("."):
+            # Left behind by an upload that was interrupted before it could clean up
+            if path.suffix == ".part":
+                stale_temp_files.append(path)
+        elif path.parent == VARIANT_DIR:
+            variant_stems.add(path.stem.rsplit("_", 1)[0])
+        else:
+            originals.add(path.name)
+    return originals, variant_stems, stale_temp_files
+
+async def reconcile_photo_references(dry_run: bool = False) -> set:
+    """Recompute each photo record's ref_count from the excursions.photos arrays, removing records no
+    excursion uses; returns the names of every photo still referenced. A dry run only logs the changes"""
+    counts = {}
+    async for row in db.excursions.aggregate([
+        {"$match": {"photos.0": {"$exists": True}}},
+        {"$unwind": "$photos"},
+        {"$group": {"_id": "$photos", "count": {"$sum": 1}}}
+    ]):
+        counts[row["_id"]] = row["count"]
+
+    referenced = set(counts)
+    released = []
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=PHOTO_SWEEP_GRACE_SECONDS)
+    async for photo in db.photos.find({"deleting": {"$ne": True}}):
+        expected = counts.get(photo["filename"], 0)
+        referenced_at = photo.get("referenced_at")
+        if photo["ref_count"] == expected or (referenced_at is not None and referenced_at > cutoff):
+            # Recently referenced records may belong to an upload that has not attached the photo yet
+            referenced.add(photo["filename"])
+            continue
+        # Guarded on the count we read, so a concurrent upload or release is never overwritten
+        guard = {"_id": photo["_id"], "ref_count": photo["ref_count"], "deleting": {"$ne": True}}
+        if dry_run:
+            logger.info(f"Photo sweep (dry run) would set ref_count of photo {photo['filename']} from {photo['ref_count']} to {expected}")
+            if expected:
+                referenced.add(photo["filename"])
+        elif expected:
+            if (await db.photos.update_one(guard, {"$set": {"ref_count": expected}})).modified_count:
+                logger.warning(f"Corrected ref_count of photo {photo['filename']} from {photo['ref_count']} to {expected}")
+            referenced.add(photo["filename"])
+        elif (await db.photos.delete_one(guard)).deleted_count:
+            released.append(photo["filename"])
+        else:
+            # Changed since we read it; the next sweep looks again
+            referenced.add(photo["filename"])
+    if released:
+        logger.warning(f"Released {len(released)} photo records no excursion references")
+        await enqueue_photo_cleanup(released)
+    return referenced
+
+async def sweep_photo_storage(dry_run: bool = False) -> int:
+    """Reconcile the files on disk with the photos still referenced, queueing every orphan for cleanup"""
+    if not await db.excursions.find_one({}, {"_id": 1}):
+        # More likely a wrong or freshly restored database than a site without a single excursion
+        logger.warning("Photo sweep skipped: no excursions found")
+        return 0
+    originals, variant_stems, stale_temp_files = await asyncio.to_thread(scan_photo_storage, PHOTO_SWEEP_GRACE_SECONDS)
+
+    referenced = await reconcile_photo_references(dry_run)
+    referenced_stems = {Path(photo_name).stem for photo_name in referenced}
+
+    # Only content-addressed files are reclaimed - each got its photos record before it was moved into
+    # place. Legacy UUID-named files are removed with their excursion and never by the sweep
+    orphans = {photo_name for photo_name in originals if is_content_addressed(photo_name) and photo_name not in referenced}
+    # Variants outliving their original; the extension only matters for locating the original
+    orphans.update(f"{stem}.jpg" for stem in variant_stems if is_content_addressed(stem) and stem not in referenced_stems)
+    orphans = sorted(orphans)
+    if dry_run:
+        logger.info(f"Photo sweep (dry run) would queue {len(orphans)} orphaned photos and remove "
+                    f"{len(stale_temp_files)} stale uploads: {orphans}")
+        return len(orphans)
+    await enqueue_photo_cleanup(orphans)
+
+    for path in stale_temp_files:
+        try:
+            await aiofiles.os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    if orphans or stale_temp_files:
+        logger.info(f"Photo sweep queued {len(orphans)} orphaned photos and removed {len(stale_temp_files)} stale uploads")
+    return len(orphans)
+
+async def sweep_photo_storage_periodically():
+    while True:
+        try:
+            await sweep_photo_storage(dry_run=PHOTO_SWEEP == "dry-run")
+        except Exception:
+            logger.exception("Photo storage sweep failed")
+        await asyncio.sleep(PHOTO_SWEEP_INTERVAL_SECONDS)
+
+# Photo serving utilities
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against our ETag, as RFC 9110 requires for GET"""
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+def parse_byte_range(range_header: str, size: int) -> Optional[tuple]:
+    """Parse a single 'bytes=start-end' range into inclusive offsets; None if it cannot be satisfied"""
+    unit, _, spec = range_header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return None
+    start, _, end = spec.strip().partition("-")
+    try:
+        if start:
+            first = int(start)
+            last = int(end) if end else size - 1
+        else:
+            # Suffix range: the last N bytes
+            first = max(size - int(end), 0)
+            last = size - 1
+    except ValueError:
+        return None
+    last = min(last, size - 1)
+    if first > last or first >= size:
+        return None
+    return first, last
+
+async def iter_file_range(path: Path, first: int, last: int):
+    """Yield the inclusive byte range of a file in upload-sized chunks"""
+    remaining = last - first + 1
+    async with aiofiles.open(path, 'rb') as f:
+        await f.seek(first)
+        while remaining > 0:
+            chunk = await f.read(min(UPLOAD_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+def serve_photo_file(request: Request, path: Path, etag: str, cache_control: str, vary: Optional[str] = None):
+    """Serve a photo with conditional (ETag) and Range support; full bodies go through FileResponse,
+    which uses the server's zero-copy send where available"""
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Accept-Ranges": "bytes"}
+    if vary:
+        headers["Vary"] = vary
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (not if_range or if_range == etag):
+        size = path.stat().st_size
+        byte_range = parse_byte_range(range_header, size)
+        if byte_range is None:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+        first, last = byte_range
+        headers["Content-Range"] = f"bytes {first}-{last}/{size}"
+        headers["Content-Length"] = str(last - first + 1)
+        media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        return StreamingResponse(iter_file_range(path, first, last), status_code=206, headers=headers, media_type=media_type)
+
+    return FileResponse(path, headers=headers)
+
+@app.get("/uploads/photos/{photo_name}")
+async def get_photo(photo_name: str, request: Request):
+    if not is_safe_photo_name(photo_name):
+        raise HTTPException(status_code=404, detail="Photo not found")
+
+    path = photo_path(photo_name)
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail="Photo not found")
+
+    # Photo names are content hashes (or one-off UUIDs), so the bytes behind a name never change
+    return serve_photo_file(request, path, f'"{Path(photo_name).stem}"', IMMUTABLE_CACHE_CONTROL)
+
+@api_router.get("/photos/{photo_name}/{variant}")
+async def get_photo_variant(photo_name: str, variant: str, request: Request):
+    if variant not in PHOTO_VARIANTS or not is_safe_photo_name(photo_name):
+        raise HTTPException(status_code=404, detail="Photo not found")
+
+    stem = Path(photo_name).stem
+    image_format = "webp" if "image/webp" in request.headers.get("accept", "") else "jpg"
+    path = variant_path(photo_name, variant, image_format)
+    if path.exists():
+        return serve_photo_file(request, path, f'"{stem}-{variant}-{image_format}"', IMMUTABLE_CACHE_CONTROL, vary="Accept")
+
+    # Variant not generated yet - serve the original meanwhile, revalidated so the variant replaces it
+    original = photo_path(photo_name)
+    if not original.is_file():
+        raise HTTPException(status_code=404, detail="Photo not found")
+    schedule_variant_generation(photo_name)
+    return serve_photo_file(request, original, f'"{stem}-original"', "no-cache", vary="Accept")
+
+def byte_limited_receive(receive, limit: int):
+    """Wrap an ASGI receive so a body growing past limit bytes is rejected while it streams in"""
+    received = 0
+
+    async def limited_receive():
+        nonlocal received
+        message = await receive()
+        if message["type"] == "http.request":
+            received += len(message.get("body", b""))
+            if received > limit:
+                raise HTTPException(status_code=413, detail="Upload too large")
+        return message
+
+    return limited_receive
+
+async def read_upload_form(request: Request) -> Any:
+    """Parse the multipart body ourselves so MAX_UPLOAD_BYTES holds before anything is spooled,
+    including chunked bodies that carry no Content-Length"""
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="Upload too large")
+    limited_request = Request(request.scope, byte_limited_receive(request.receive, MAX_UPLOAD_BYTES))
+    return await limited_request.form()
+
+# The files are read from the request instead of a File(...) parameter, which FastAPI
+# would parse and spool in full before the handler (and its limits) ever ran
 @api_router.post("/excursions/{excursion_id}/photos")
 async def upload_photos(
     excursion_id: str,
-    files: List[UploadFile] = File(...),
+    request: Request,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user)
 ):
     # Check if excursion exists and user owns it
-    excursion = await db.excursions.find_one({"id": excursion_id})
+    excursion = await db.excursions.find_one({"id": excursion_id}, {"author_id": 1, "photos": 1})
     if not excursion:
         raise HTTPException(status_code=404, detail="Excursion not found")
     
     if excursion["author_id"] != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized")
-    
-    uploaded_files = []
-    for file in files:
-        if not file.content_type.startswith('image/'):
-            raise HTTPException(status_code=400, detail="Only image files allowed")
-        
-        # Generate unique filename
-        file_extension = file.filename.split('.')[-1] if '.' in file.filename else 'jpg'
-        filename = f"{uuid.uuid4()}.{file_extension}"
-        file_path = UPLOAD_DIR / filename
-        
-        # Save file
-        async with aiofiles.open(file_path, 'wb') as f:
-            content = await file.read()
-            await f.write(content)
-        
-        uploaded_files.append(filename)
-    
-    # Update excursion photos
-    await db.excursions.update_one(
-        {"id": excursion_id},
-        {"$push": {"photos": {"$each": uploaded_files}}}
+
+    form = await read_upload_form(request)
+    try:
+        files = [value for value in form.getlist("files") if isinstance(value, FormFile)]
+        if not files:
+            raise HTTPException(status_code=400, detail="No files uploaded")
+        return await store_uploaded_photos(excursion_id, excursion, files, background_tasks)
+    finally:
+        await form.close()
+
+async def attach_photo(excursion_id: str, photo_name: str) -> bool:
+    """Add a photo to an excursion unless it is already there; False also when the excursion is gone"""
+    result = await db.excursions.update_one(
+        {"id": excursion_id, "photos": {"$ne": photo_name}},
+        {"$push": {"photos": photo_name}}
     )
+    return result.modified_count == 1
+
+async def detach_uploaded_photo(excursion_id: str, photo_name: str):
+    result = await db.excursions.update_one({"id": excursion_id}, {"$pull": {"photos": photo_name}})
+    if result.modified_count:
+        await release_photo(photo_name)
+
+async def store_uploaded_photos(excursion_id: str, excursion: dict, files: List[FormFile], background_tasks: BackgroundTasks) -> dict:
+    attached_photos = set(excursion.get("photos", []))
+    uploaded_files = []
+    new_files = []
+    remaining_bytes = MAX_UPLOAD_BYTES
+    try:
+        for file in files:
+            if file.content_type and not file.content_type.startswith('image/'):
+                raise HTTPException(status_code=400, detail="Only image files allowed")
+
+            temp_path, image_format, size, content_hash = await stream_photo_to_disk(file, remaining_bytes)
+            remaining_bytes -= size
+
+            filename = f"{content_hash}.{image_format}"
+            if filename in attached_photos:
+                # Same picture uploaded to this excursion again
+                await aiofiles.os.remove(temp_path)
+                continue
+
+            is_new_file = await store_photo_blob(temp_path, filename, size)
+            # The reference just taken is kept only if this request is the one that attached the photo;
+            # a concurrent upload of the same picture or a deleted excursion hands it straight back
+            if not await attach_photo(excursion_id, filename):
+                await release_photo(filename)
+                if not await db.excursions.find_one({"id": excursion_id}, {"_id": 1}):
+                    raise HTTPException(status_code=404, detail="Excursion not found")
+                continue
+
+            if is_new_file:
+                new_files.append(filename)
+            attached_photos.add(filename)
+            uploaded_files.append(filename)
+    except BaseException:
+        # A rejected request attaches nothing - undo the earlier files of this request
+        for filename in uploaded_files:
+            await detach_uploaded_photo(excursion_id, filename)
+        raise
+
+    # Resized variants are produced after the response has been sent
+    background_tasks.add_task(generate_variants_in_background, new_files)
     
     return {"uploaded_files": uploaded_files}
 
@@ -769,25 +2617,88 @@ async def delete_photo(
     if excursion["author_id"] != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    # Remove photo from database
-    await db.excursions.update_one(
-        {"id": excursion_id},
-        {"$pull": {"photos": photo_name}}
-    )
-    
-    # Delete physical file
-    file_path = UPLOAD_DIR / photo_name
-    if file_path.exists():
-        file_path.unlink()
+    # Remove photo from database and give back its reference in one go; the files
+    # are queued for removal once no excursion uses them
+    async def detach_photo(session):
+        result = await db.excursions.update_one(
+            {"id": excursion_id},
+            {"$pull": {"photos": photo_name}},
+            session=session
+        )
+        if result.modified_count and is_safe_photo_name(photo_name):
+            await release_photo(photo_name, session=session)
+
+    await run_transaction(detach_photo)
+    photo_cleanup_wakeup.set()
     
     return {"message": "Photo deleted successfully"}
 
 # Review Routes
+async def fetch_review_page(query: dict, response: Response, limit: int, cursor: Optional[str],
+                            min_rating: Optional[int], with_titles: bool = False) -> List[dict]:
+    """Run one page of a review listing in (created_at, id) descending order, joining excursion titles on request"""
+    if min_rating:
+        query["rating"] = {"$gte": min_rating}
+    if cursor:
+        query.update(keyset_filter(cursor))
+
+    pipeline = [{"$match": query}, {"$sort": {"created_at": -1, "id": -1}}, {"$limit": limit}]
+    if with_titles:
+        # Joined after $limit so only the reviews on this page look up their excursion
+        pipeline += [
+            {"$lookup": {
+                "from": "excursions",
+                "localField": "excursion_id",
+                "foreignField": "id",
+                "pipeline": [{"$project": {"_id": 0, "title": 1}}],
+                "as": "excursion"
+            }},
+            {"$set": {"excursion_title": {"$first": "$excursion.title"}}},
+            {"$unset": "excursion"}
+        ]
+    reviews = await db.reviews.aggregate(pipeline).to_list(length=limit)
+
+    if len(reviews) == limit:
+        last = reviews[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.get("created_at"), last["id"])
+    return reviews
+
+async def summarize_reviews(query: dict) -> ReviewSummary:
+    """Per-star counts and the average for every review matching the query, from a single aggregation"""
+    histogram = empty_rating_histogram()
+    async for row in db.reviews.aggregate([
+        {"$match": query},
+        {"$group": {"_id": "$rating", "count": {"$sum": 1}}}
+    ]):
+        histogram[str(row["_id"])] = row["count"]
+
+    review_count = sum(histogram.values())
+    rating_sum = sum(int(star) * count for star, count in histogram.items())
+    return ReviewSummary(
+        review_count=review_count,
+        average_rating=compute_average_rating(rating_sum, review_count),
+        rating_histogram=histogram
+    )
+
 @api_router.get("/excursions/{excursion_id}/reviews", response_model=List[Review])
-async def get_reviews(excursion_id: str):
-    reviews = await db.reviews.find({"excursion_id": excursion_id}).sort("created_at", -1).to_list(length=None)
+async def get_reviews(
+    excursion_id: str,
+    response: Response,
+    user_id: Optional[str] = None,
+    min_rating: Optional[int] = Query(None, ge=1, le=5),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    query = {"excursion_id": excursion_id}
+    if user_id:
+        query["user_id"] = user_id
+    reviews = await fetch_review_page(query, response, limit, cursor, min_rating)
     return [Review(**review) for review in reviews]
 
+@api_router.get("/excursions/{excursion_id}/reviews/summary", response_model=ReviewSummary)
+async def get_review_summary(excursion_id: str):
+    return await summarize_reviews({"excursion_id": excursion_id})
+
 @api_router.post("/excursions/{excursion_id}/reviews", response_model=Review)
 async def create_review(
     excursion_id: str,
@@ -795,7 +2706,7 @@ async def create_review(
     current_user: User = Depends(get_current_user)
 ):
     # Check if excursion exists
-    excursion = await db.excursions.find_one({"id": excursion_id})
+    excursion = await db.excursions.find_one({"id": excursion_id}, {"_id": 1})
     if not excursion:
         raise HTTPException(status_code=404, detail="Excursion not found")
     
@@ -815,73 +2726,129 @@ async def create_review(
     )
     
     review_dict = prepare_for_mongo(review.dict())
-    await db.reviews.insert_one(review_dict)
-    
-    # Update excursion rating
-    reviews = await db.reviews.find({"excursion_id": excursion_id}).to_list(length=None)
-    average_rating = sum(r["rating"] for r in reviews) / len(reviews)
-    
+    try:
+        await db.reviews.insert_one(review_dict)
+    except DuplicateKeyError:
+        # A concurrent request from the same user won the race
+        raise HTTPException(status_code=400, detail="You already reviewed this excursion")
+
+    # Update excursion rating totals atomically. Documents from before the running totals (only written
+    # by an older server during a rollout) are left alone; migrate.py recounts them, this review included
+    updated = await db.excursions.find_one_and_update(
+        {"id": excursion_id, "schema_version": {"$gte": RATING_TOTALS_SCHEMA_VERSION}},
+        {"$inc": {
+            "rating_sum": review.rating,
+            "review_count": 1,
+            f"rating_histogram.{review.rating}": 1
+        }},
+        projection={"rating_sum": 1, "review_count": 1, "_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
+
+    if not updated:
+        logger.warning("Excursion %s predates the rating totals; run migrate.py to count review %s", excursion_id, review.id)
+        return review
+
+    # Only store the average if no other review landed in between - that one sets a newer value
     await db.excursions.update_one(
-        {"id": excursion_id},
-        {
-            "$set": {
-                "average_rating": round(average_rating, 1),
-                "review_count": len(reviews)
-            }
-        }
+        {"id": excursion_id, "review_count": updated["review_count"]},
+        {"$set": {"average_rating": compute_average_rating(updated["rating_sum"], updated["review_count"])}}
     )
-    
+
     return review
 
 # User Routes
-@api_router.get("/user/reviews", response_model=List[Review])
-async def get_user_reviews(current_user: User = Depends(get_current_user)):
-    reviews = await db.reviews.find({"user_id": current_user.id}).sort("created_at", -1).to_list(length=None)
-    return [Review(**review) for review in reviews]
+@api_router.get("/user/reviews", response_model=List[UserReview])
+async def get_user_reviews(
+    response: Response,
+    min_rating: Optional[int] = Query(None, ge=1, le=5),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    reviews = await fetch_review_page({"user_id": current_user.id}, response, limit, cursor, min_rating, with_titles=True)
+    return [UserReview(**review) for review in reviews]
+
+@api_router.get("/user/reviews/summary", response_model=ReviewSummary)
+async def get_user_review_summary(current_user: User = Depends(get_current_user)):
+    return await summarize_reviews({"user_id": current_user.id})
 
 def get_region_options_for_country(country: str):
     """Get region options based on country"""
-    region_mapping = {
-        Country.CH.value: [(region.name, region.value) for region in SwissCantons],
-        Country.DE.value: [(region.name, region.value) for region in GermanStates],
-        Country.IT.value: [(region.name, region.value) for region in ItalianRegions],
-        Country.FR.value: [(region.name, region.value) for region in FrenchRegions],
-        Country.AT.value: [(region.name, region.value) for region in AustrianStates]
-    }
-    return region_mapping.get(country, [])
+    return REGION_OPTIONS.get(country, [])
+
+# Reference data payloads - the enums never change at runtime, so these are serialized once at import
+REFERENCE_CACHE_CONTROL = "public, max-age=86400"
+
+class StaticPayload:
+    """Pre-serialized JSON body with a content-hash ETag"""
+
+    def __init__(self, data: Any):
+        self.body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+
+def enum_options(enum_class) -> List[dict]:
+    return [{"value": member.name, "label": member.value} for member in enum_class]
+
+COUNTRIES_PAYLOAD = StaticPayload(enum_options(Country))
+CANTONS_PAYLOAD = StaticPayload(enum_options(SwissCantons))
+CATEGORIES_PAYLOAD = StaticPayload(enum_options(Category))
+PARKING_SITUATIONS_PAYLOAD = StaticPayload(enum_options(ParkingSituation))
+REGION_PAYLOADS = {
+    country.name: StaticPayload([{"value": key, "label": label} for key, label in REGION_OPTIONS[country.value]])
+    for country in Country
+}
+# Regions may be requested by country code or by name
+REGION_PAYLOADS.update({country.value: REGION_PAYLOADS[country.name] for country in Country})
+REFERENCE_DATA_PAYLOAD = StaticPayload({
+    "countries": enum_options(Country),
+    "regions": {
+        country.name: [{"value": key, "label": label} for key, label in REGION_OPTIONS[country.value]]
+        for country in Country
+    },
+    "cantons": enum_options(SwissCantons),
+    "categories": enum_options(Category),
+    "parking_situations": enum_options(ParkingSituation)
+})
+
+def static_payload_response(request: Request, payload: StaticPayload) -> Response:
+    """Serve a precomputed payload, answering a matching If-None-Match with 304"""
+    headers = {"ETag": payload.etag, "Cache-Control": REFERENCE_CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, payload.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=payload.body, media_type="application/json", headers=headers)
 
 # Utility Routes
+@api_router.get("/reference-data")
+async def get_reference_data(request: Request):
+    # Everything the excursion forms and filters need, in one conditional request
+    return static_payload_response(request, REFERENCE_DATA_PAYLOAD)
+
 @api_router.get("/countries")
-async def get_countries():
-    return [{"value": country.name, "label": country.value} for country in Country]
+async def get_countries(request: Request):
+    return static_payload_response(request, COUNTRIES_PAYLOAD)
 
 @api_router.get("/regions/{country_code}")
-async def get_regions(country_code: str):
+async def get_regions(country_code: str, request: Request):
     # Find country by code or name
-    country_value = None
-    for country in Country:
-        if country.name == country_code or country.value == country_code:
-            country_value = country.value
-            break
-    
-    if not country_value:
+    payload = REGION_PAYLOADS.get(country_code)
+    if not payload:
         raise HTTPException(status_code=404, detail="Country not found")
-    
-    regions = get_region_options_for_country(country_value)
-    return [{"value": region[0], "label": region[1]} for region in regions]
+    return static_payload_response(request, payload)
 
 @api_router.get("/cantons")
-async def get_cantons():
+async def get_cantons(request: Request):
     # Deprecated - use /regions/CH instead
-    return [{"value": canton.name, "label": canton.value} for canton in SwissCantons]
+    return static_payload_response(request, CANTONS_PAYLOAD)
 
 @api_router.get("/categories")
-async def get_categories():
-    return [{"value": category.name, "label": category.value} for category in Category]
+async def get_categories(request: Request):
+    return static_payload_response(request, CATEGORIES_PAYLOAD)
 
 @api_router.get("/parking-situations")
-async def get_parking_situations():
-    return [{"value": parking.name, "label": parking.value} for parking in ParkingSituation]
+async def get_parking_situations(request: Request):
+    return static_payload_response(request, PARKING_SITUATIONS_PAYLOAD)
 
 # Include router
 app.include_router(api_router)
@@ -893,14 +2860,423 @@ app.add_middleware(
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, REQUEST_ID_HEADER],
 )
 
+# Request metrics
+class MetricsMiddleware:
+    """Record latency, response size and status per route template. Plain ASGI rather than
+    BaseHTTPMiddleware so streamed and file responses are measured to their last byte."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        response_size = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        http_requests_in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec()
+            # Labelled by template (/api/excursions/{excursion_id}) so label cardinality stays bounded
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            http_request_duration.labels(method, route, str(status_code)).observe(time.perf_counter() - start)
+            http_response_size.labels(method, route).observe(response_size)
+
+app.add_middleware(MetricsMiddleware)
+
+async def monitor_event_loop_lag():
+    """Measure how late a short sleep wakes up - anything blocking the loop shows up here"""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(EVENT_LOOP_LAG_INTERVAL_SECONDS)
+        event_loop_lag.set(max(0.0, loop.time() - start - EVENT_LOOP_LAG_INTERVAL_SECONDS))
+
+# Request tracing
+def request_id_from_scope(scope) -> str:
+    """Reuse a well-formed incoming request ID so traces line up with the caller's logs"""
+    for name, value in scope["headers"]:
+        if name == b"x-request-id":
+            request_id = value.decode("latin-1")
+            if 0 < len(request_id) <= 128 and all(c.isalnum() or c in "-_." for c in request_id):
+                return request_id
+            break
+    return uuid.uuid4().hex
+
+def otlp_attribute(key: str, value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+def otlp_span(trace: RequestTrace, span: Span) -> dict:
+    failed = "error" in span.attributes or span.attributes.get("http.status_code", 0) >= 500
+    return {
+        "traceId": trace.trace_id,
+        "spanId": span.span_id,
+        "parentSpanId": span.parent_id or "",
+        "name": span.name,
+        # SERVER for the request itself, INTERNAL for its phases
+        "kind": 2 if span.parent_id is None else 1,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [otlp_attribute("request.id", trace.request_id)] + [
+            otlp_attribute(key, value) for key, value in span.attributes.items()
+        ],
+        "status": {"code": 2 if failed else 0}
+    }
+
+def otlp_payload(traces: List[RequestTrace]) -> dict:
+    """An OTLP/JSON ExportTraceServiceRequest for a batch of finished requests"""
+    return {"resourceSpans": [{
+        "resource": {"attributes": [otlp_attribute("service.name", TRACE_SERVICE_NAME)]},
+        "scopeSpans": [{
+            "scope": {"name": "ausfluege.tracing"},
+            "spans": [otlp_span(trace, span) for trace in traces for span in trace.spans]
+        }]
+    }]}
+
+def format_span_breakdown(trace: RequestTrace, root: Span) -> str:
+    """Indented span tree with durations, plus the time no child span accounts for"""
+    children: Dict[Optional[str], List[Span]] = {}
+    for span in trace.spans:
+        children.setdefault(span.parent_id, []).append(span)
+
+    lines = []
+    def add(span: Span, depth: int):
+        lines.append(f"{'  ' * depth}{span.name}: {span.duration_ms:.1f}ms")
+        for child in sorted(children.get(span.span_id, []), key=lambda child: child.start_ns):
+            add(child, depth + 1)
+    add(root, 0)
+    untraced = root.duration_ms - sum(child.duration_ms for child in children.get(root.span_id, []))
+    lines.append(f"  (untraced): {untraced:.1f}ms")
+    return "\n".join(lines)
+
+class TraceExporter:
+    """Batch finished traces and ship them as OTLP/JSON - one export request per line
+    to TRACE_EXPORT_FILE and/or POSTed to TRACE_EXPORT_URL"""
+
+    def __init__(self, file_path: Optional[str], url: Optional[str]):
+        self.file_path = file_path
+        self.url = url
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=TRACE_EXPORT_QUEUE_SIZE)
+        self.http_client = httpx.AsyncClient(timeout=5) if url else None
+        self.dropped = 0
+
+    def submit(self, trace: RequestTrace):
+        if not (self.file_path or self.url):
+            return
+        try:
+            self.queue.put_nowait(trace)
+        except asyncio.QueueFull:
+            # Exporting must never slow down or back up request handling
+            self.dropped += 1
+
+    async def run(self):
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < TRACE_EXPORT_BATCH_SIZE and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            body = orjson.dumps(otlp_payload(batch))
+            try:
+                if self.file_path:
+                    async with aiofiles.open(self.file_path, 'ab') as f:
+                        await f.write(body + b"\n")
+                if self.url:
+                    response = await self.http_client.post(self.url, content=body, headers={"Content-Type": "application/json"})
+                    response.raise_for_status()
+            except (OSError, httpx.HTTPError) as e:
+                logger.warning(f"Could not export {len(batch)} traces: {e}")
+
+    async def aclose(self):
+        if self.http_client is not None:
+            await self.http_client.aclose()
+
+trace_exporter = TraceExporter(TRACE_EXPORT_FILE, TRACE_EXPORT_URL) if TRACING_ENABLED else None
+
+class TracingMiddleware:
+    """Open a root span per request, tag the response with its request ID and hand the finished trace on"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = request_id_from_scope(scope)
+        trace_id = request_id if len(request_id) == 32 and all(c in "0123456789abcdef" for c in request_id) else secrets.token_hex(16)
+        trace = RequestTrace(request_id, trace_id)
+        root = Span(trace, "request", None, {"http.method": scope["method"], "http.target": scope["path"]})
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                root.set_attribute("http.status_code", message["status"])
+                message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        trace_token = current_trace.set(trace)
+        try:
+            with root:
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            current_trace.reset(trace_token)
+            route = getattr(scope.get("route"), "path", "unmatched")
+            root.name = f"{scope['method']} {route}"
+            root.set_attribute("http.route", route)
+            if root.duration_ms >= SLOW_REQUEST_THRESHOLD_MS:
+                logger.warning(
+                    f"Slow request {root.name} took {root.duration_ms:.1f}ms "
+                    f"(request_id={request_id}):\n{format_span_breakdown(trace, root)}"
+                )
+            trace_exporter.submit(trace)
+
+if TRACING_ENABLED:
+    app.add_middleware(TracingMiddleware)
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 
+# Index provisioning - one entry per query path used by the routes above
+LISTING_SORT = [("created_at", DESCENDING), ("id", DESCENDING)]
+RATING_SORT = [("average_rating", DESCENDING), ("review_count", DESCENDING), ("id", ASCENDING)]
+
+INDEX_SPECS = {
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+    ],
+    "sessions": [
+        # Looked up by _id (the token hash); this one serves logout and the per-user cap
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)], name="user_created"),
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+    "excursions": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("location", "2dsphere")], name="location_2dsphere"),
+        IndexModel(
+            [("title", TEXT), ("description", TEXT), ("address", TEXT)],
+            name="text_search",
+            weights={"title": 10, "address": 3, "description": 1},
+            default_language="german",
+            textIndexVersion=3
+        ),
+        IndexModel(LISTING_SORT, name="listing"),
+        IndexModel(RATING_SORT, name="rating"),
+        IndexModel([("author_id", ASCENDING)] + LISTING_SORT, name="author_listing"),
+        IndexModel([("country", ASCENDING), ("region", ASCENDING)] + LISTING_SORT, name="country_region_listing"),
+        IndexModel([("category", ASCENDING)] + LISTING_SORT, name="category_listing"),
+        IndexModel(
+            [("is_free", ASCENDING), ("is_outdoor", ASCENDING), ("has_grill", ASCENDING)] + LISTING_SORT,
+            name="flags_listing"
+        ),
+    ],
+    "photos": [
+        IndexModel([("hash", ASCENDING)], name="hash_unique", unique=True),
+    ],
+    "photo_cleanup": [
+        IndexModel([("photo_name", ASCENDING)], name="photo_name_unique", unique=True),
+        IndexModel([("next_attempt_at", ASCENDING)], name="next_attempt_at"),
+    ],
+    "geocode_cache": [
+        IndexModel([("address_key", ASCENDING)], name="address_key_unique", unique=True),
+    ],
+    "reviews": [
+        IndexModel([("excursion_id", ASCENDING), ("user_id", ASCENDING)], name="excursion_user_unique", unique=True),
+        IndexModel([("excursion_id", ASCENDING)] + LISTING_SORT, name="excursion_listing"),
+        IndexModel([("user_id", ASCENDING)] + LISTING_SORT, name="user_listing"),
+    ],
+}
+
+# Long-running startup jobs, kept referenced until shutdown
+background_jobs = set()
+
+async def ensure_indexes():
+    """Create every declared index that is missing and report duplicates; safe to run repeatedly"""
+    for collection_name, index_models in INDEX_SPECS.items():
+        collection = db[collection_name]
+        existing = await collection.index_information()
+
+        # Report indexes that share a key pattern - they cost writes without helping reads
+        seen_keys = {}
+        for name, info in existing.items():
+            key = tuple(tuple(part) for part in info["key"])
+            if key in seen_keys:
+                logger.warning(f"Duplicate index on {collection_name}: {name} and {seen_keys[key]} both cover {list(key)}")
+            else:
+                seen_keys[key] = name
+
+        for index_model in index_models:
+            document = index_model.document
+            if document["name"] in existing:
+                continue
+
+            logger.info(f"Creating missing index {collection_name}.{document['name']}")
+            try:
+                await collection.create_indexes([index_model])
+            except OperationFailure as e:
+                # Conflicting options or duplicate values under a unique index
+                logger.error(f"Could not create index {collection_name}.{document['name']}: {e}")
+
+# Schema migrations - each step takes a batch of documents at the previous version
+# and returns the fields to set per document _id
+async def migrate_canton_to_country_region(docs: List[dict]) -> Dict[Any, dict]:
+    """v1: Switzerland-only documents with a 'canton' field get country/region"""
+    return {doc["_id"]: canton_migration_fields(doc) for doc in docs}
+
+async def migrate_rating_totals(docs: List[dict]) -> Dict[Any, dict]:
+    """v2: running rating totals (rating_sum, review_count, rating_histogram) recomputed from the reviews"""
+    histograms = {doc["id"]: empty_rating_histogram() for doc in docs}
+    pipeline = [
+        {"$match": {"excursion_id": {"$in": list(histograms)}}},
+        {"$group": {"_id": {"excursion_id": "$excursion_id", "rating": "$rating"}, "count": {"$sum": 1}}}
+    ]
+    async for row in db.reviews.aggregate(pipeline):
+        histograms[row["_id"]["excursion_id"]][str(row["_id"]["rating"])] = row["count"]
+
+    updates = {}
+    for doc in docs:
+        histogram = histograms[doc["id"]]
+        review_count = sum(histogram.values())
+        rating_sum = sum(int(star) * count for star, count in histogram.items())
+        updates[doc["_id"]] = {
+            "rating_sum": rating_sum,
+            "review_count": review_count,
+            "rating_histogram": histogram,
+            "average_rating": compute_average_rating(rating_sum, review_count)
+        }
+    return updates
+
+MIGRATIONS = {
+    1: migrate_canton_to_country_region,
+    2: migrate_rating_totals,
+}
+
+# Fields a step derives from data that live requests also write; the update is guarded on the values
+# read so a concurrent create_review $inc is never overwritten - the document is retried instead
+MIGRATION_GUARDED_FIELDS = {
+    2: ("review_count", "rating_sum"),
+}
+
+MAX_MIGRATION_PASSES = 5
+
+def outdated_excursions_query(target_version: int) -> dict:
+    return {"$or": [{"schema_version": {"$exists": False}}, {"schema_version": {"$lt": target_version}}]}
+
+async def run_migrations(batch_size: int = 500, dry_run: bool = False,
+                         target_version: int = CURRENT_SCHEMA_VERSION) -> int:
+    """Bring every excursion up to target_version in batches. Progress is the schema_version stored on
+    each document, so an interrupted run simply resumes where it stopped."""
+    migrated = 0
+    for _ in range(MAX_MIGRATION_PASSES):
+        conflicts = 0
+        last_id = None
+        while True:
+            query = outdated_excursions_query(target_version)
+            if last_id is not None:
+                query["_id"] = {"$gt": last_id}
+            batch = await db.excursions.find(query).sort("_id", ASCENDING).limit(batch_size).to_list(length=batch_size)
+            if not batch:
+                break
+            last_id = batch[-1]["_id"]
+
+            updates = {doc["_id"]: {} for doc in batch}
+            # Guarded on the version we read, so a concurrent run never applies a step twice
+            guards = {doc["_id"]: {"_id": doc["_id"], "schema_version": doc.get("schema_version")} for doc in batch}
+            for version in range(1, target_version + 1):
+                pending = [doc for doc in batch if doc.get("schema_version", 0) < version]
+                if not pending:
+                    continue
+                for doc in pending:
+                    for field in MIGRATION_GUARDED_FIELDS.get(version, ()):
+                        guards[doc["_id"]][field] = doc.get(field)
+                for doc_id, fields in (await MIGRATIONS[version](pending)).items():
+                    updates[doc_id].update(fields)
+                for doc in pending:
+                    # Later steps see the output of earlier ones
+                    doc.update(updates[doc["_id"]])
+
+            if dry_run:
+                migrated += len(batch)
+            else:
+                result = await db.excursions.bulk_write([
+                    UpdateOne(guards[doc["_id"]], {"$set": {**updates[doc["_id"]], "schema_version": target_version}})
+                    for doc in batch
+                ], ordered=False)
+                migrated += result.matched_count
+                conflicts += len(batch) - result.matched_count
+            logger.info(f"Migrated {migrated} excursions to schema version {target_version}")
+
+        if not conflicts:
+            return migrated
+        # Documents changed between read and write are still below target_version; the next pass retries them
+        logger.info(f"{conflicts} excursions changed during migration, retrying them")
+    logger.warning(f"Excursions still changing after {MAX_MIGRATION_PASSES} migration passes; re-run to finish")
+    return migrated
+
+async def ensure_schema_current():
+    """Refuse to serve while excursions below CURRENT_SCHEMA_VERSION exist. create_review $incs the
+    v2 rating totals, which are wrong on a document the recount has not reached, and the recount
+    itself races with reviews being written - so migrate.py runs it before the server starts."""
+    if await db.excursions.count_documents(outdated_excursions_query(CURRENT_SCHEMA_VERSION), limit=1):
+        raise RuntimeError(
+            f"Excursions below schema version {CURRENT_SCHEMA_VERSION} found; "
+            "run `python migrate.py` before starting the server"
+        )
+
+@app.on_event("startup")
+async def run_startup_tasks():
+    await ensure_indexes()
+    await ensure_schema_current()
+    await detect_transaction_support()
+    await migrate_legacy_sessions()
+    background_jobs.add(asyncio.create_task(monitor_event_loop_lag()))
+    if trace_exporter is not None:
+        background_jobs.add(asyncio.create_task(trace_exporter.run()))
+    background_jobs.add(asyncio.create_task(process_photo_cleanup_queue()))
+    if PHOTO_SWEEP in ("dry-run", "on"):
+        background_jobs.add(asyncio.create_task(sweep_photo_storage_periodically()))
+    background_jobs.add(asyncio.create_task(refresh_autocomplete_index()))
+    if geocoder is not None:
+        background_jobs.add(asyncio.create_task(backfill_coordinates()))
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    client.close()
+    password_executor.shutdown(wait=False)
+    photo_process_pool.shutdown(wait=False)
+    await auth_http_client.aclose()
+    if trace_exporter is not None:
+        await trace_exporter.aclose()
+    if geocoder is not None:
+        await geocoder.aclose()
+    for job in background_jobs:
+        job.cancel()
\ No newline at end of file
@@ -41,6 +41,7 @@ const AddExcursion = () => {
   const [regions, setRegions] = useState([]);
   const [categories, setCategories] = useState([]);
   const [parkingSituations, setParkingSituations] = useState([]);
+  const [regionsByCountry, setRegionsByCountry] = useState({});
   
   // Google Places states
   const [placeSuggestions, setPlaceSuggestions] = useState([]);
@@ -66,19 +67,18 @@ const AddExcursion = () => {
 
   const loadOptions = async () => {
     try {
-      const [countriesRes, categoriesRes, parkingRes] = await Promise.all([
-        axios.get(`${API}/countries`),
-        axios.get(`${API}/categories`),
-        axios.get(`${API}/parking-situations`)
-      ]);
-      
-      setCountries(countriesRes.data);
-      setCategories(categoriesRes.data);
-      setParkingSituations(parkingRes.data);
+      // One cacheable request for all form options
+      const response = await axios.get(`${API}/reference-data`);
+      const referenceData = response.data;
+
+      setCountries(referenceData.countries);
+      setCategories(referenceData.categories);
+      setParkingSituations(referenceData.parking_situations);
+      setRegionsByCountry(referenceData.regions);
       
       // Load default regions for Switzerland
       if (formData.country) {
-        loadRegionsForCountry(formData.country);
+        setRegions(referenceData.regions[formData.country] || []);
       }
     } catch (error) {
       console.error('Error loading options:', error);
@@ -87,6 +87,11 @@ const AddExcursion = () => {
   };
 
   const loadRegionsForCountry = async (countryCode) => {
+    if (regionsByCountry[countryCode]) {
+      setRegions(regionsByCountry[countryCode]);
+      return;
+    }
+
     try {
       const response = await axios.get(`${API}/regions/${countryCode}`);
       setRegions(response.data);
@@ -41,6 +41,7 @@ const EditExcursion = () => {
   const [regions, setRegions] = useState([]);
   const [categories, setCategories] = useState([]);
   const [parkingSituations, setParkingSituations] = useState([]);
+  const [regionsByCountry, setRegionsByCountry] = useState({});
   const [excursion, setExcursion] = useState(null);
   
   // Photo management
@@ -102,21 +103,25 @@ const EditExcursion = () => {
 
   const loadOptions = async () => {
     try {
-      const [countriesRes, categoriesRes, parkingRes] = await Promise.all([
-        axios.get(`${API}/countries`),
-        axios.get(`${API}/categories`),
-        axios.get(`${API}/parking-situations`)
-      ]);
-      
-      setCountries(countriesRes.data);
-      setCategories(categoriesRes.data);
-      setParkingSituations(parkingRes.data);
+      // One cacheable request for all form options
+      const response = await axios.get(`${API}/reference-data`);
+      const referenceData = response.data;
+
+      setCountries(referenceData.countries);
+      setCategories(referenceData.categories);
+      setParkingSituations(referenceData.parking_situations);
+      setRegionsByCountry(referenceData.regions);
     } catch (error) {
       console.error('Error loading options:', error);
     }
   };
 
   const loadRegionsForCountry = async (countryCode) => {
+    if (regionsByCountry[countryCode]) {
+      setRegions(regionsByCountry[countryCode]);
+      return;
+    }
+
     try {
       const response = await axios.get(`${API}/regions/${countryCode}`);
       setRegions(response.data);
@@ -490,7 +495,7 @@ const EditExcursion = () => {
                       {currentPhotos.map((photo) => (
                         <div key={photo} className="relative group">
                           <img
-                            src={`${BACKEND_URL}/uploads/photos/${photo}`}
+                            src={`${API}/photos/${photo}/thumb`}
                             alt="Ausflug"
                             className="w-full h-24 object-cover rounded-lg border"
                           />
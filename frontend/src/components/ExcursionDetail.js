@@ -16,6 +16,7 @@ import { toast } from 'sonner';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
+const REVIEW_PAGE_SIZE = 20;
 
 const ExcursionDetail = () => {
   const { id } = useParams();
@@ -23,6 +24,10 @@ const ExcursionDetail = () => {
   
   const [excursion, setExcursion] = useState(null);
   const [reviews, setReviews] = useState([]);
+  const [reviewCursor, setReviewCursor] = useState(null);
+  const [reviewSummary, setReviewSummary] = useState(null);
+  const [hasOwnReview, setHasOwnReview] = useState(false);
+  const [loadingMoreReviews, setLoadingMoreReviews] = useState(false);
   const [loading, setLoading] = useState(true);
   const [reviewLoading, setReviewLoading] = useState(false);
   const [showReviewForm, setShowReviewForm] = useState(false);
@@ -36,6 +41,10 @@ const ExcursionDetail = () => {
     loadReviews();
   }, [id]);
 
+  useEffect(() => {
+    loadOwnReview();
+  }, [id, user]);
+
   const loadExcursion = async () => {
     try {
       const response = await axios.get(`${API}/excursions/${id}`);
@@ -50,10 +59,46 @@ const ExcursionDetail = () => {
 
   const loadReviews = async () => {
     try {
-      const response = await axios.get(`${API}/excursions/${id}/reviews`);
-      setReviews(response.data);
+      // Only the newest page is fetched; totals and per-star counts come from the summary
+      const [reviewsResponse, summaryResponse] = await Promise.all([
+        axios.get(`${API}/excursions/${id}/reviews`, { params: { limit: REVIEW_PAGE_SIZE } }),
+        axios.get(`${API}/excursions/${id}/reviews/summary`)
+      ]);
+      setReviews(reviewsResponse.data);
+      setReviewCursor(reviewsResponse.headers['x-next-cursor'] || null);
+      setReviewSummary(summaryResponse.data);
+    } catch (error) {
+      console.error('Error loading reviews:', error);
+    }
+  };
+
+  const loadMoreReviews = async () => {
+    setLoadingMoreReviews(true);
+    try {
+      const response = await axios.get(`${API}/excursions/${id}/reviews`, {
+        params: { limit: REVIEW_PAGE_SIZE, cursor: reviewCursor }
+      });
+      setReviews(prev => [...prev, ...response.data]);
+      setReviewCursor(response.headers['x-next-cursor'] || null);
     } catch (error) {
       console.error('Error loading reviews:', error);
+    } finally {
+      setLoadingMoreReviews(false);
+    }
+  };
+
+  const loadOwnReview = async () => {
+    if (!user) {
+      setHasOwnReview(false);
+      return;
+    }
+    try {
+      const response = await axios.get(`${API}/excursions/${id}/reviews`, {
+        params: { user_id: user.id, limit: 1 }
+      });
+      setHasOwnReview(response.data.length > 0);
+    } catch (error) {
+      console.error('Error loading own review:', error);
     }
   };
 
@@ -82,7 +127,7 @@ const ExcursionDetail = () => {
       setShowReviewForm(false);
       
       // Reload data
-      await Promise.all([loadExcursion(), loadReviews()]);
+      await Promise.all([loadExcursion(), loadReviews(), loadOwnReview()]);
     } catch (error) {
       console.error('Error creating review:', error);
       if (error.response?.status === 400) {
@@ -192,7 +237,7 @@ const ExcursionDetail = () => {
               <div className="relative h-64 bg-gradient-to-br from-emerald-400 to-teal-500">
                 {excursion.photos && excursion.photos.length > 0 ? (
                   <img
-                    src={`${BACKEND_URL}/uploads/photos/${excursion.photos[0]}`}
+                    src={`${API}/photos/${excursion.photos[0]}/full`}
                     alt={excursion.title}
                     className="w-full h-full object-cover"
                   />
@@ -261,7 +306,7 @@ const ExcursionDetail = () => {
                     {excursion.photos.slice(1).map((photo, index) => (
                       <img
                         key={index}
-                        src={`${BACKEND_URL}/uploads/photos/${photo}`}
+                        src={`${API}/photos/${photo}/card`}
                         alt={`${excursion.title} Foto ${index + 2}`}
                         className="w-full h-32 object-cover rounded-lg gallery-image"
                       />
@@ -276,10 +321,10 @@ const ExcursionDetail = () => {
               <CardHeader className="flex flex-row items-center justify-between">
                 <CardTitle className="flex items-center space-x-2">
                   <MessageCircle className="w-5 h-5" />
-                  <span>Bewertungen ({reviews.length})</span>
+                  <span>Bewertungen ({reviewSummary ? reviewSummary.review_count : reviews.length})</span>
                 </CardTitle>
                 
-                {isAuthenticated && !reviews.find(r => r.user_id === user.id) && (
+                {isAuthenticated && !hasOwnReview && (
                   <Button
                     onClick={() => setShowReviewForm(!showReviewForm)}
                     className="bg-emerald-600 hover:bg-emerald-700"
@@ -339,6 +384,28 @@ const ExcursionDetail = () => {
                   </Card>
                 )}
 
+                {/* Rating Histogram */}
+                {reviewSummary && reviewSummary.review_count > 0 && (
+                  <div className="space-y-1">
+                    {[5, 4, 3, 2, 1].map((star) => {
+                      const count = reviewSummary.rating_histogram[star] || 0;
+                      return (
+                        <div key={star} className="flex items-center space-x-2 text-sm">
+                          <span className="w-3 text-gray-600">{star}</span>
+                          <Star className="w-3 h-3 text-yellow-400 fill-current" />
+                          <div className="flex-1 h-2 bg-gray-200 rounded">
+                            <div
+                              className="h-2 bg-yellow-400 rounded"
+                              style={{ width: `${(count / reviewSummary.review_count) * 100}%` }}
+                            />
+                          </div>
+                          <span className="w-8 text-right text-gray-500">{count}</span>
+                        </div>
+                      );
+                    })}
+                  </div>
+                )}
+
                 {/* Reviews List */}
                 {reviews.length === 0 ? (
                   <div className="text-center py-8">
@@ -384,6 +451,16 @@ const ExcursionDetail = () => {
                         </CardContent>
                       </Card>
                     ))}
+                    {reviewCursor && (
+                      <Button
+                        variant="outline"
+                        className="w-full"
+                        onClick={loadMoreReviews}
+                        disabled={loadingMoreReviews}
+                      >
+                        {loadingMoreReviews ? 'Wird geladen...' : 'Weitere Bewertungen laden'}
+                      </Button>
+                    )}
                   </div>
                 )}
               </CardContent>
@@ -468,7 +545,7 @@ const ExcursionDetail = () => {
                     Anmelden um zu bewerten
                   </Button>
                 ) : (
-                  reviews.find(r => r.user_id === user.id) ? (
+                  hasOwnReview ? (
                     <div className="text-center py-4 text-gray-600">
                       <MessageCircle className="w-8 h-8 mx-auto mb-2 text-emerald-600" />
                       <p className="text-sm">Du hast diesen Ausflug bereits bewertet</p>
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { Link } from 'react-router-dom';
 import axios from 'axios';
 import { Search, Filter, MapPin, Star, Mountain, Waves, TreePine, List, Map } from 'lucide-react';
@@ -12,11 +12,15 @@ import MapView from './MapView';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
+const PAGE_SIZE = 24;
 
 const ExcursionList = () => {
   const [excursions, setExcursions] = useState([]);
-  const [filteredExcursions, setFilteredExcursions] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [resultCount, setResultCount] = useState(0);
+  const [catalogueSize, setCatalogueSize] = useState(0);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [searchTerm, setSearchTerm] = useState('');
   const [filters, setFilters] = useState({
     canton: '',
@@ -25,6 +29,9 @@ const ExcursionList = () => {
     is_outdoor: null,
     has_grill: null
   });
+  const [searchResults, setSearchResults] = useState(null); // null while not searching
+  const [searchHasMore, setSearchHasMore] = useState(false);
+  const latestSearch = useRef('');
   const [showFilters, setShowFilters] = useState(false);
   const [viewMode, setViewMode] = useState('list'); // 'list' or 'map'
   
@@ -33,18 +40,72 @@ const ExcursionList = () => {
   const [categories, setCategories] = useState([]);
 
   useEffect(() => {
-    loadExcursions();
     loadFilterOptions();
+    loadCatalogueSize();
   }, []);
 
   useEffect(() => {
-    applyFilters();
-  }, [excursions, searchTerm, filters]);
+    loadExcursions();
+  }, [filters]);
+
+  useEffect(() => {
+    const term = searchTerm.trim();
+    latestSearch.current = searchKey(term);
+    if (term.length < 2) {
+      setSearchResults(null);
+      return;
+    }
+
+    // Debounce so typing does not fire one search per keystroke
+    const timeout = setTimeout(() => searchExcursions(term, 0), 300);
+    return () => clearTimeout(timeout);
+  }, [searchTerm, filters]);
+
+  // Search results are rendered as the server ranks them, one page at a time; partial words
+  // like "Blau" match through the server's prefix index
+  const searchKey = (term) => `${term}|${JSON.stringify(filters)}`;
+
+  const searchExcursions = async (term, offset) => {
+    const key = searchKey(term);
+    if (offset > 0) setLoadingMore(true);
+    try {
+      const response = await axios.get(`${API}/excursions/search`, {
+        params: { ...filterParams(), q: term, fields: 'card', limit: PAGE_SIZE, offset }
+      });
+      if (latestSearch.current !== key) return; // the term or filters changed meanwhile
+      setSearchResults(prev => (offset > 0 && prev ? [...prev, ...response.data] : response.data));
+      setSearchHasMore(response.data.length === PAGE_SIZE);
+    } catch (error) {
+      console.error('Error searching excursions:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  // Filters are applied by the server; the list is fetched one cursor page at a time
+  const filterParams = () => {
+    const params = {};
+    if (filters.canton) {
+      params.country = 'Schweiz';
+      params.region = filters.canton;
+    }
+    if (filters.category) params.category = filters.category;
+    ['is_free', 'is_outdoor', 'has_grill'].forEach((key) => {
+      if (filters[key] !== null) params[key] = filters[key];
+    });
+    return params;
+  };
 
   const loadExcursions = async () => {
     try {
-      const response = await axios.get(`${API}/excursions`);
-      setExcursions(response.data);
+      const params = filterParams();
+      const [pageResponse, facetsResponse] = await Promise.all([
+        axios.get(`${API}/excursions`, { params: { ...params, fields: 'card', limit: PAGE_SIZE } }),
+        axios.get(`${API}/excursions/facets`, { params })
+      ]);
+      setExcursions(pageResponse.data);
+      setNextCursor(pageResponse.headers['x-next-cursor'] || null);
+      setResultCount(facetsResponse.data.total);
     } catch (error) {
       console.error('Error loading excursions:', error);
     } finally {
@@ -52,50 +113,49 @@ const ExcursionList = () => {
     }
   };
 
-  const loadFilterOptions = async () => {
+  const loadMoreExcursions = async () => {
+    setLoadingMore(true);
     try {
-      const [cantonsRes, categoriesRes] = await Promise.all([
-        axios.get(`${API}/cantons`),
-        axios.get(`${API}/categories`)
-      ]);
-      
-      setCantons(cantonsRes.data);
-      setCategories(categoriesRes.data);
+      const response = await axios.get(`${API}/excursions`, {
+        params: { ...filterParams(), fields: 'card', limit: PAGE_SIZE, cursor: nextCursor }
+      });
+      setExcursions(prev => [...prev, ...response.data]);
+      setNextCursor(response.headers['x-next-cursor'] || null);
     } catch (error) {
-      console.error('Error loading filter options:', error);
+      console.error('Error loading excursions:', error);
+    } finally {
+      setLoadingMore(false);
     }
   };
 
-  const applyFilters = () => {
-    let filtered = [...excursions];
-
-    // Search term filter
-    if (searchTerm) {
-      filtered = filtered.filter(excursion =>
-        excursion.title.toLowerCase().includes(searchTerm.toLowerCase()) ||
-        excursion.description.toLowerCase().includes(searchTerm.toLowerCase()) ||
-        excursion.address.toLowerCase().includes(searchTerm.toLowerCase())
-      );
+  const loadCatalogueSize = async () => {
+    try {
+      const response = await axios.get(`${API}/stats`);
+      setCatalogueSize(response.data.excursions);
+    } catch (error) {
+      console.error('Error loading stats:', error);
     }
+  };
 
-    // Apply other filters
-    if (filters.canton) {
-      filtered = filtered.filter(e => e.canton === filters.canton);
-    }
-    if (filters.category) {
-      filtered = filtered.filter(e => e.category === filters.category);
-    }
-    if (filters.is_free !== null) {
-      filtered = filtered.filter(e => e.is_free === filters.is_free);
-    }
-    if (filters.is_outdoor !== null) {
-      filtered = filtered.filter(e => e.is_outdoor === filters.is_outdoor);
-    }
-    if (filters.has_grill !== null) {
-      filtered = filtered.filter(e => e.has_grill === filters.has_grill);
+  const loadFilterOptions = async () => {
+    try {
+      const response = await axios.get(`${API}/reference-data`);
+      setCantons(response.data.cantons);
+      setCategories(response.data.categories);
+    } catch (error) {
+      console.error('Error loading filter options:', error);
     }
+  };
 
-    setFilteredExcursions(filtered);
+  const shownExcursions = searchResults || excursions;
+  const hasMore = searchResults ? searchHasMore : Boolean(nextCursor);
+
+  const loadMore = () => {
+    if (searchResults) {
+      searchExcursions(searchTerm.trim(), searchResults.length);
+    } else {
+      loadMoreExcursions();
+    }
   };
 
   const resetFilters = () => {
@@ -172,7 +232,7 @@ const ExcursionList = () => {
             <div>
               <h1 className="text-3xl font-bold text-gray-900 mb-2">Alle Ausflüge</h1>
               <p className="text-gray-600">
-                Entdecke {excursions.length} Ausflugsziele in der ganzen Schweiz
+                Entdecke {catalogueSize} Ausflugsziele in der ganzen Schweiz
               </p>
             </div>
             
@@ -247,7 +307,7 @@ const ExcursionList = () => {
                     <SelectContent>
                       <SelectItem value="">Alle Kantone</SelectItem>
                       {cantons.map((canton) => (
-                        <SelectItem key={canton.value} value={canton.value}>
+                        <SelectItem key={canton.value} value={canton.label}>
                           {canton.label}
                         </SelectItem>
                       ))}
@@ -270,7 +330,7 @@ const ExcursionList = () => {
                     <SelectContent>
                       <SelectItem value="">Alle Kategorien</SelectItem>
                       {categories.map((category) => (
-                        <SelectItem key={category.value} value={category.value}>
+                        <SelectItem key={category.value} value={category.label}>
                           {category.label}
                         </SelectItem>
                       ))}
@@ -335,16 +395,18 @@ const ExcursionList = () => {
         {/* Results */}
         <div className="mb-6">
           <p className="text-gray-600">
-            {filteredExcursions.length} Ausflug{filteredExcursions.length !== 1 ? 'e' : ''} gefunden
+            {searchResults
+              ? `${searchResults.length}${searchHasMore ? '+' : ''} Ausflug${searchResults.length !== 1 || searchHasMore ? 'e' : ''} gefunden`
+              : `${resultCount} Ausflug${resultCount !== 1 ? 'e' : ''} gefunden`}
           </p>
         </div>
 
         {/* Content - List or Map View */}
         {viewMode === 'map' ? (
-          <MapView excursions={filteredExcursions} filters={filters} />
+          <MapView searchResults={searchResults} params={filterParams()} />
         ) : (
           /* List View */
-          filteredExcursions.length === 0 ? (
+          shownExcursions.length === 0 ? (
             <Card className="p-8 text-center">
               <MapPin className="w-12 h-12 text-gray-400 mx-auto mb-4" />
               <h3 className="text-lg font-semibold text-gray-900 mb-2">
@@ -359,12 +421,12 @@ const ExcursionList = () => {
             </Card>
           ) : (
             <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
-              {filteredExcursions.map((excursion) => (
+              {shownExcursions.map((excursion) => (
                 <Card key={excursion.id} className="card-hover border-0 shadow-lg overflow-hidden">
                   <div className="relative h-48 bg-gradient-to-br from-emerald-400 to-teal-500">
                     {excursion.photos && excursion.photos.length > 0 ? (
                       <img
-                        src={`${BACKEND_URL}/uploads/photos/${excursion.photos[0]}`}
+                        src={`${API}/photos/${excursion.photos[0]}/card`}
                         alt={excursion.title}
                         className="w-full h-full object-cover"
                       />
@@ -429,6 +491,19 @@ const ExcursionList = () => {
             </div>
           )
         )}
+
+        {hasMore && (
+          <div className="text-center mt-8">
+            <Button
+              variant="outline"
+              onClick={loadMore}
+              disabled={loadingMore}
+              className="border-emerald-200 text-emerald-700 hover:bg-emerald-50"
+            >
+              {loadingMore ? 'Wird geladen...' : 'Weitere Ausflüge laden'}
+            </Button>
+          </div>
+        )}
       </div>
     </div>
   );
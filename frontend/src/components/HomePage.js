@@ -24,22 +24,17 @@ const HomePage = () => {
 
   const loadFeaturedExcursions = async () => {
     try {
-      const response = await axios.get(`${API}/excursions`);
-      const excursions = response.data;
+      // Top 6 excursions by rating and the catalogue stats, both computed by the server
+      const [featuredResponse, statsResponse] = await Promise.all([
+        axios.get(`${API}/excursions`, { params: { sort: 'rating', limit: 6, fields: 'card' } }),
+        axios.get(`${API}/stats`)
+      ]);
       
-      // Get top 6 excursions by rating
-      const featured = excursions
-        .sort((a, b) => b.average_rating - a.average_rating)
-        .slice(0, 6);
-      
-      setFeaturedExcursions(featured);
-      
-      // Calculate stats
-      const categories = new Set(excursions.map(e => e.category));
+      setFeaturedExcursions(featuredResponse.data);
       setStats({
-        total: excursions.length,
-        categories: categories.size,
-        users: new Set(excursions.map(e => e.author_id)).size
+        total: statsResponse.data.excursions,
+        categories: statsResponse.data.categories,
+        users: statsResponse.data.authors
       });
     } catch (error) {
       console.error('Error loading featured excursions:', error);
@@ -180,7 +175,7 @@ const HomePage = () => {
                   <div className="relative h-48 bg-gradient-to-br from-emerald-400 to-teal-500">
                     {excursion.photos && excursion.photos.length > 0 ? (
                       <img
-                        src={`${BACKEND_URL}/uploads/photos/${excursion.photos[0]}`}
+                        src={`${API}/photos/${excursion.photos[0]}/card`}
                         alt={excursion.title}
                         className="w-full h-full object-cover"
                       />
@@ -197,7 +192,7 @@ const HomePage = () => {
                     )}
                     <div className="absolute top-3 right-3">
                       <Badge className="bg-white/90 text-emerald-700 hover:bg-white">
-                        {excursion.canton}
+                        {excursion.region || excursion.canton}
                       </Badge>
                     </div>
                   </div>
@@ -4,25 +4,64 @@ import { Card, CardContent } from './ui/card';
 import { Badge } from './ui/badge';
 import { Star, MapPin } from 'lucide-react';
 import { Link } from 'react-router-dom';
+import axios from 'axios';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
+const API = `${BACKEND_URL}/api`;
+// Supported countries (CH, DE, AT, FR, IT) until the map reports its own viewport
+const DEFAULT_BBOX = [-5.5, 35.5, 19.0, 55.1];
+const MAX_MAP_MARKERS = 500;
 
-const MapView = ({ excursions, filters }) => {
+// Without searchResults the map loads whatever lies in its viewport from /excursions/geo,
+// instead of showing only the page the list happens to have loaded
+const MapView = ({ searchResults, params }) => {
   const mapRef = useRef(null);
   const [map, setMap] = useState(null);
   const [markers, setMarkers] = useState([]);
   const [infoWindows, setInfoWindows] = useState([]);
+  const [bbox, setBbox] = useState(DEFAULT_BBOX);
+  const [viewportExcursions, setViewportExcursions] = useState([]);
+  const excursions = searchResults || viewportExcursions;
 
   useEffect(() => {
     initializeMap();
   }, []);
 
+  useEffect(() => {
+    if (!map) return;
+    const listener = map.addListener('idle', () => {
+      const bounds = map.getBounds();
+      if (!bounds) return;
+      const southWest = bounds.getSouthWest();
+      const northEast = bounds.getNorthEast();
+      setBbox([southWest.lng(), southWest.lat(), northEast.lng(), northEast.lat()]);
+    });
+    return () => listener.remove();
+  }, [map]);
+
+  useEffect(() => {
+    if (!searchResults) {
+      loadViewport();
+    }
+  }, [bbox, JSON.stringify(params), searchResults]);
+
   useEffect(() => {
     if (map) {
       updateMarkers();
     }
   }, [excursions, map]);
 
+  const loadViewport = async () => {
+    try {
+      const response = await axios.get(`${API}/excursions/geo`, {
+        params: { ...params, bbox: bbox.join(','), fields: 'card', limit: MAX_MAP_MARKERS }
+      });
+      setViewportExcursions(response.data);
+    } catch (error) {
+      console.error('Error loading map excursions:', error);
+    }
+  };
+
   const initializeMap = async () => {
     console.warn('Google Maps disabled - API key needed');
     // For demo purposes, show a placeholder
@@ -43,7 +82,10 @@ const MapView = ({ excursions, filters }) => {
 
     for (const excursion of excursions) {
       try {
-        const result = await geocodeAddress(geocoder, excursion.address);
+        // Coordinates are geocoded on the server; only very old entries still need a lookup
+        const result = excursion.lat != null && excursion.lng != null
+          ? { location: { lat: excursion.lat, lng: excursion.lng } }
+          : await geocodeAddress(geocoder, excursion.address);
         if (result) {
           const marker = createMarker(excursion, result.location);
           const infoWindow = createInfoWindow(excursion);
@@ -65,8 +107,8 @@ const MapView = ({ excursions, filters }) => {
     setMarkers(newMarkers);
     setInfoWindows(newInfoWindows);
 
-    // Adjust map bounds to show all markers
-    if (newMarkers.length > 0) {
+    // Fit search results into view; viewport results already are, and refitting would reload them
+    if (searchResults && newMarkers.length > 0) {
       const bounds = new window.google.maps.LatLngBounds();
       newMarkers.forEach(marker => bounds.extend(marker.getPosition()));
       map.fitBounds(bounds);
@@ -123,7 +165,7 @@ const MapView = ({ excursions, filters }) => {
 
   const createInfoWindow = (excursion) => {
     const imageUrl = excursion.photos && excursion.photos.length > 0
-      ? `${BACKEND_URL}/uploads/photos/${excursion.photos[0]}`
+      ? `${BACKEND_URL}/api/photos/${excursion.photos[0]}/card`
       : null;
 
     const contentString = `
@@ -146,7 +188,7 @@ const MapView = ({ excursions, filters }) => {
         
         <div style="display: flex; flex-wrap: gap; margin-bottom: 12px;">
           <span style="background: #ECFDF5; color: #047857; padding: 4px 8px; border-radius: 12px; font-size: 12px; margin-right: 8px;">
-            ${excursion.canton}
+            ${excursion.region || excursion.canton}
           </span>
           ${excursion.is_free ? '<span style="background: #F0FDF4; color: #166534; padding: 4px 8px; border-radius: 12px; font-size: 12px;">Gratis</span>' : ''}
         </div>
@@ -9,11 +9,15 @@ import axios from 'axios';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
+const REVIEW_PAGE_SIZE = 20;
 
 const ProfilePage = () => {
   const { user, isAuthenticated, loading } = useContext(AuthContext);
   const [userExcursions, setUserExcursions] = useState([]);
   const [userReviews, setUserReviews] = useState([]);
+  const [userReviewCount, setUserReviewCount] = useState(0);
+  const [reviewCursor, setReviewCursor] = useState(null);
+  const [loadingMoreReviews, setLoadingMoreReviews] = useState(false);
   const [loadingData, setLoadingData] = useState(true);
 
   useEffect(() => {
@@ -24,19 +28,32 @@ const ProfilePage = () => {
 
   const loadUserActivities = async () => {
     try {
-      // Load user's excursions
-      const excursionsResponse = await axios.get(`${API}/excursions`, {
-        withCredentials: true
-      });
-      const userExcs = excursionsResponse.data.filter(exc => exc.author_id === user.id);
+      // Load user's excursions - filtered by the server, page by page
+      const userExcs = [];
+      let cursor = null;
+      do {
+        const excursionsResponse = await axios.get(`${API}/excursions`, {
+          params: { author_id: user.id, limit: 100, ...(cursor ? { cursor } : {}) },
+          withCredentials: true
+        });
+        userExcs.push(...excursionsResponse.data);
+        cursor = excursionsResponse.headers['x-next-cursor'] || null;
+      } while (cursor);
       setUserExcursions(userExcs);
 
-      // Load user's reviews (we'll need to get all reviews and filter)
-      // For now, we'll implement a simple solution
-      const reviewsResponse = await axios.get(`${API}/user/reviews`, {
-        withCredentials: true
-      });
+      // Load the newest page of the user's reviews (with excursion titles) and the total count
+      const [reviewsResponse, summaryResponse] = await Promise.all([
+        axios.get(`${API}/user/reviews`, {
+          params: { limit: REVIEW_PAGE_SIZE },
+          withCredentials: true
+        }),
+        axios.get(`${API}/user/reviews/summary`, {
+          withCredentials: true
+        })
+      ]);
       setUserReviews(reviewsResponse.data || []);
+      setReviewCursor(reviewsResponse.headers['x-next-cursor'] || null);
+      setUserReviewCount(summaryResponse.data.review_count);
       
     } catch (error) {
       console.error('Error loading user activities:', error);
@@ -47,6 +64,22 @@ const ProfilePage = () => {
     }
   };
 
+  const loadMoreReviews = async () => {
+    setLoadingMoreReviews(true);
+    try {
+      const response = await axios.get(`${API}/user/reviews`, {
+        params: { limit: REVIEW_PAGE_SIZE, cursor: reviewCursor },
+        withCredentials: true
+      });
+      setUserReviews(prev => [...prev, ...response.data]);
+      setReviewCursor(response.headers['x-next-cursor'] || null);
+    } catch (error) {
+      console.error('Error loading user reviews:', error);
+    } finally {
+      setLoadingMoreReviews(false);
+    }
+  };
+
   const renderRating = (rating) => {
     return (
       <div className="flex items-center">
@@ -113,7 +146,7 @@ const ProfilePage = () => {
               <div className="bg-emerald-100 w-12 h-12 rounded-full flex items-center justify-center mx-auto mb-4">
                 <Star className="w-6 h-6 text-emerald-600" />
               </div>
-              <h3 className="text-2xl font-bold text-gray-900 mb-2">{userReviews.length}</h3>
+              <h3 className="text-2xl font-bold text-gray-900 mb-2">{userReviewCount}</h3>
               <p className="text-gray-600">Bewertungen geschrieben</p>
             </CardContent>
           </Card>
@@ -215,7 +248,7 @@ const ProfilePage = () => {
               <CardHeader>
                 <CardTitle className="flex items-center space-x-2">
                   <MessageCircle className="w-5 h-5 text-emerald-600" />
-                  <span>Deine Bewertungen ({userReviews.length})</span>
+                  <span>Deine Bewertungen ({userReviewCount})</span>
                 </CardTitle>
               </CardHeader>
               <CardContent>
@@ -247,6 +280,9 @@ const ProfilePage = () => {
                               </span>
                             </div>
                           </div>
+                          {review.excursion_title && (
+                            <h4 className="font-semibold text-gray-900 mb-1">{review.excursion_title}</h4>
+                          )}
                           <p className="text-gray-700 mb-3">{review.comment}</p>
                           <Link to={`/ausflug/${review.excursion_id}`} className="text-emerald-600 hover:text-emerald-700 text-sm font-medium">
                             Ausflug ansehen →
@@ -254,6 +290,16 @@ const ProfilePage = () => {
                         </CardContent>
                       </Card>
                     ))}
+                    {reviewCursor && (
+                      <Button
+                        variant="outline"
+                        className="w-full"
+                        onClick={loadMoreReviews}
+                        disabled={loadingMoreReviews}
+                      >
+                        {loadingMoreReviews ? 'Wird geladen...' : 'Weitere Bewertungen laden'}
+                      </Button>
+                    )}
                   </div>
                 )}
               </CardContent>
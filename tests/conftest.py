@@ -0,0 +1,50 @@
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+
+class AuthProviderStub(BaseHTTPRequestHandler):
+    """Stand-in for the OAuth provider; answers with the queued responses in order"""
+
+    responses = []
+    requests = []
+
+    def do_GET(self):
+        AuthProviderStub.requests.append((self.path, self.headers.get("X-Session-ID")))
+        status, body = AuthProviderStub.responses.pop(0) if AuthProviderStub.responses else (500, b"")
+        if status is None:
+            # Drop the connection without answering - a transport error on the client side
+            self.close_connection = True
+            return
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# server.py reads its settings at import time, so the stub has to be listening before the import
+auth_provider_stub = ThreadingHTTPServer(("127.0.0.1", 0), AuthProviderStub)
+threading.Thread(target=auth_provider_stub.serve_forever, daemon=True).start()
+
+os.environ["AUTH_PROVIDER_URL"] = f"http://127.0.0.1:{auth_provider_stub.server_port}"
+os.environ["AUTH_PROVIDER_RETRIES"] = "2"
+os.environ["AUTH_PROVIDER_FAILURE_THRESHOLD"] = "2"
+os.environ["BCRYPT_ROUNDS"] = "4"  # minimum cost, keeps hashing tests fast
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test_database")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+
+@pytest.fixture
+def auth_provider():
+    AuthProviderStub.responses = []
+    AuthProviderStub.requests = []
+    return AuthProviderStub
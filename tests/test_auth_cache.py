@@ -0,0 +1,54 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+from server import TTLCache, User, UserCache, hash_token
+
+
+def make_user(user_id="user-1"):
+    return User(id=user_id, email=f"{user_id}@example.com", name="Anna")
+
+
+def test_entries_expire_with_their_token():
+    cache = UserCache(max_entries=10, ttl_seconds=60)
+    cache.put("token", make_user(), datetime.now(timezone.utc) + timedelta(milliseconds=50))
+
+    assert cache.get("token").id == "user-1"
+    time.sleep(0.06)
+    assert cache.get("token") is None
+
+
+def test_expired_tokens_are_not_cached():
+    cache = UserCache(max_entries=10, ttl_seconds=60)
+    cache.put("token", make_user(), datetime.now(timezone.utc) - timedelta(seconds=1))
+
+    assert cache.get("token") is None
+
+
+def test_entries_are_keyed_by_token_hash():
+    cache = UserCache(max_entries=10, ttl_seconds=60)
+    cache.put("token", make_user())
+
+    assert list(cache._entries) == [hash_token("token")]
+
+
+def test_invalidate_token_and_user():
+    cache = UserCache(max_entries=10, ttl_seconds=60)
+    cache.put("a", make_user("user-1"))
+    cache.put("b", make_user("user-1"))
+    cache.put("c", make_user("user-2"))
+
+    cache.invalidate_token("c")
+    assert cache.get("c") is None
+
+    cache.invalidate_user("user-1")
+    assert cache.get("a") is None and cache.get("b") is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(max_entries=2, ttl_seconds=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
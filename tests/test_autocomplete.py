@@ -0,0 +1,92 @@
+import pytest
+
+import server
+from server import AutocompleteIndex, PrefixIndex, fold_for_prefix
+
+EXCURSIONS = [
+    {"id": "1", "title": "Blausee Rundweg", "address": "Blausee 1, 3717 Kandergrund"},
+    {"id": "2", "title": "Zoo Zürich", "address": "Zürichbergstrasse 221, 8044 Zürich"},
+    {"id": "3", "title": "Rheinfall", "address": "Rheinfallquai 32, 8212 Neuhausen"},
+]
+
+
+def labels(results):
+    return [result["label"] for result in results]
+
+
+def test_fold_for_prefix_ignores_case_accents_and_spacing():
+    assert fold_for_prefix("  Zürich   Oerlikon ") == "zurich oerlikon"
+
+
+def test_every_word_start_matches():
+    index = AutocompleteIndex.from_excursions(EXCURSIONS)
+
+    assert labels(index.search("blau", 10, {"title"})) == ["Blausee Rundweg"]
+    assert labels(index.search("Rund", 10, {"title"})) == ["Blausee Rundweg"]
+    assert labels(index.search("rhein", 10, {"title"})) == ["Rheinfall"]
+    assert index.search("weg", 10, {"title"}) == []
+
+
+def test_kinds_restrict_the_search():
+    index = AutocompleteIndex.from_excursions(EXCURSIONS)
+
+    assert labels(index.search("zur", 10, {"region"})) == ["Zürich"]
+    assert labels(index.search("zur", 10, {"title"})) == ["Zoo Zürich"]
+    assert {result["kind"] for result in index.search("zur", 10)} == {"region", "title", "place"}
+
+
+def test_results_are_in_key_order_deduplicated_and_limited():
+    index = PrefixIndex()
+    index.load([
+        (("title", "1"), "Seilpark", {"kind": "title", "label": "Seilpark"}),
+        (("title", "2"), "Seilpark", {"kind": "title", "label": "Seilpark"}),
+        (("place", "3"), "Seebad", {"kind": "place", "label": "Seebad"}),
+        (("title", "4"), "Seealpsee", {"kind": "title", "label": "Seealpsee"}),
+    ])
+
+    assert labels(index.search("se", 10)) == ["Seealpsee", "Seebad", "Seilpark"]
+    assert labels(index.search("se", 2)) == ["Seealpsee", "Seebad"]
+
+
+def test_incremental_updates_match_a_bulk_load():
+    index = AutocompleteIndex.from_excursions(EXCURSIONS[:1])
+    index.add_excursion(EXCURSIONS[2])
+    index.add_excursion({**EXCURSIONS[0], "title": "Oeschinensee"})
+
+    assert index.search("blau", 10, {"title"}) == []
+    assert labels(index.search("oesch", 10, {"title"})) == ["Oeschinensee"]
+
+    index.remove_excursion("3")
+    assert index.search("rhein", 10, {"title", "place"}) == []
+    assert index._keys == AutocompleteIndex.from_excursions([{**EXCURSIONS[0], "title": "Oeschinensee"}])._keys
+
+
+def test_matching_excursion_ids_covers_partial_words():
+    index = AutocompleteIndex.from_excursions(EXCURSIONS)
+
+    assert index.matching_excursion_ids("Zür", 10) == ["2"]
+    assert sorted(index.matching_excursion_ids("r", 10)) == ["1", "3"]
+    assert len(index.matching_excursion_ids("r", 1)) == 1
+
+
+@pytest.mark.asyncio
+async def test_edits_during_a_rebuild_survive_the_swap(monkeypatch):
+    monkeypatch.setattr(server, "autocomplete_index", AutocompleteIndex.from_excursions(EXCURSIONS))
+
+    async def build_from_stale_snapshot():
+        snapshot = list(EXCURSIONS)
+        # Edits landing while the build awaits the database
+        server.autocomplete_add_excursion({"id": "4", "title": "Seilpark Pilatus", "address": "Kriens"})
+        server.autocomplete_remove_excursion("3")
+        server.autocomplete_add_excursion({**EXCURSIONS[0], "title": "Oeschinensee"})
+        return AutocompleteIndex.from_excursions(snapshot)
+
+    monkeypatch.setattr(server, "build_autocomplete_index", build_from_stale_snapshot)
+    await server.rebuild_autocomplete_index()
+
+    index = server.autocomplete_index
+    assert labels(index.search("seil", 10, {"title"})) == ["Seilpark Pilatus"]
+    assert index.search("rhein", 10, {"title", "place"}) == []
+    assert labels(index.search("oesch", 10, {"title"})) == ["Oeschinensee"]
+    assert index.search("blau", 10, {"title"}) == []
+    assert server.autocomplete_edits is None
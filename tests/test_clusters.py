@@ -0,0 +1,94 @@
+import time
+
+import pytest
+
+import server
+from server import (
+    ClusterIndex, cluster_precision, encode_geohash, geohash_cells_covering, get_excursion_clusters
+)
+
+
+def point(lat, lng, category="Wanderung"):
+    return {"lat": lat, "lng": lng, "category": category, "geohash": encode_geohash(lat, lng)}
+
+
+def test_encode_geohash_matches_the_reference_value():
+    assert encode_geohash(57.64911, 10.40744, 11) == "u4pruydqqvj"
+    assert encode_geohash(42.6, -5.6, 5) == "ezs42"
+
+
+def test_geohash_cells_nest_inside_their_prefix():
+    full = encode_geohash(47.3769, 8.5417)
+
+    assert len(full) == server.GEOHASH_PRECISION
+    assert all(encode_geohash(47.3769, 8.5417, precision) == full[:precision] for precision in range(1, 10))
+
+
+def test_covering_cells_contain_every_point_in_the_bbox():
+    bbox = (5.9, 45.8, 10.5, 47.8)  # Switzerland
+    cells = set(geohash_cells_covering(*bbox, 4))
+
+    for lat in (45.81, 46.5, 47.79):
+        for lng in (5.91, 8.0, 10.49):
+            assert encode_geohash(lat, lng, 4) in cells
+    assert encode_geohash(52.52, 13.40, 4) not in cells
+
+
+def test_wide_viewports_get_coarser_cells(monkeypatch):
+    monkeypatch.setattr(server, "MAX_CLUSTER_CELLS", 256)
+    europe = (-10.0, 35.0, 30.0, 60.0)
+
+    precision = cluster_precision(*europe, zoom=20)
+
+    assert precision < server.ZOOM_TO_GEOHASH_PRECISION[20]
+    assert len(geohash_cells_covering(*europe, precision)) <= 256
+    assert cluster_precision(8.5, 47.3, 8.6, 47.4, zoom=12) == server.ZOOM_TO_GEOHASH_PRECISION[12]
+
+
+def index_with_precisions(*precisions):
+    index = ClusterIndex(ttl_seconds=60)
+    for precision in precisions:
+        index._tiles[precision] = {}
+        index._built_at[precision] = time.monotonic()
+    return index
+
+
+def test_add_remove_and_move_keep_tiles_in_step():
+    index = index_with_precisions(2, 5)
+    zurich, bern = point(47.3769, 8.5417), point(46.9480, 7.4474, "Museum")
+
+    index.add(zurich)
+    index.add(bern)
+    coarse = index._tiles[2][zurich["geohash"][:2]]
+    assert coarse["count"] == 2
+    assert coarse["categories"] == {"Wanderung": 1, "Museum": 1}
+    assert coarse["lat_sum"] == pytest.approx(zurich["lat"] + bern["lat"])
+
+    index.remove(bern)
+    assert index._tiles[2][zurich["geohash"][:2]]["categories"] == {"Wanderung": 1}
+    assert bern["geohash"][:5] not in index._tiles[5]
+
+    moved = point(46.2044, 6.1432)  # Geneva
+    index.move(zurich, moved)
+    assert set(index._tiles[5]) == {moved["geohash"][:5]}
+    assert index._tiles[5][moved["geohash"][:5]]["lng_sum"] == pytest.approx(moved["lng"])
+
+
+def test_points_without_coordinates_are_ignored():
+    index = index_with_precisions(3)
+    index.add(None)
+    index.add({"lat": None, "lng": None, "geohash": None})
+
+    assert index._tiles[3] == {}
+
+
+@pytest.mark.asyncio
+async def test_clusters_are_looked_up_by_covering_cells(monkeypatch):
+    index = index_with_precisions(*range(1, server.GEOHASH_PRECISION + 1))
+    for excursion in [point(47.3769, 8.5417), point(47.3770, 8.5418), point(52.52, 13.40)]:
+        index.add(excursion)
+    monkeypatch.setattr(server, "cluster_index", index)
+
+    clusters = await get_excursion_clusters(bbox="5.9,45.8,10.5,47.8", zoom=8)
+
+    assert [(cluster["geohash"], cluster["count"]) for cluster in clusters] == [(encode_geohash(47.3769, 8.5417, 4), 2)]
@@ -0,0 +1,43 @@
+import pytest
+from fastapi import HTTPException
+
+from server import ExcursionCreate, normalize_excursion_input
+
+VALID = {
+    "title": "Blausee Rundweg",
+    "description": "Kurzer Rundweg um den Blausee, auch mit Kinderwagen.",
+    "address": "Blausee 1, 3717 Kandergrund",
+    "country": "CH",
+    "region": "BE",
+    "category": "HIKING",
+    "parking_situation": "GOOD",
+}
+
+
+def test_enum_keys_are_stored_as_labels():
+    normalized = normalize_excursion_input(ExcursionCreate(**VALID))
+
+    assert (normalized["country"], normalized["region"], normalized["category"], normalized["parking_situation"]) == \
+        ("Schweiz", "Bern", "Wanderung", "Gut")
+
+
+def test_labels_are_accepted_as_well():
+    normalized = normalize_excursion_input(ExcursionCreate(
+        **{**VALID, "country": "Schweiz", "region": "Bern", "category": "Wanderung", "parking_situation": "Gut"}
+    ))
+
+    assert (normalized["country"], normalized["region"]) == ("Schweiz", "Bern")
+
+
+@pytest.mark.parametrize("field, value, message", [
+    ("country", "Atlantis", "Invalid country: Atlantis"),
+    ("region", "Bayern", "Invalid region for country Schweiz: Bayern"),
+    ("category", "Kino", "Invalid category: Kino"),
+    ("parking_situation", "Irgendwo", "Invalid parking situation: Irgendwo"),
+])
+def test_invalid_values_are_reported_as_400(field, value, message):
+    with pytest.raises(HTTPException) as excinfo:
+        normalize_excursion_input(ExcursionCreate(**{**VALID, field: value}))
+
+    assert excinfo.value.status_code == 400
+    assert excinfo.value.detail == message
@@ -0,0 +1,44 @@
+import json
+
+import pytest
+
+import server
+from server import Geocoder, StaticGeocoder, create_geocoder, normalize_address
+
+
+def test_normalize_address_ignores_case_and_comma_spacing():
+    assert normalize_address("Blausee 1,  3717 KANDERGRUND") == normalize_address("blausee 1, 3717 Kandergrund")
+
+
+@pytest.mark.asyncio
+async def test_static_geocoder_answers_from_its_table():
+    geocoder = StaticGeocoder({"Blausee 1, 3717 Kandergrund": [46.53, 7.66]})
+
+    assert await geocoder.geocode("blausee 1 ,3717 kandergrund") == (46.53, 7.66)
+    assert await geocoder.geocode("Unbekannt 1") is None
+
+
+def test_static_geocoder_is_loaded_from_the_configured_file(tmp_path, monkeypatch):
+    table = tmp_path / "addresses.json"
+    table.write_text(json.dumps({"Rheinfallquai 32, 8212 Neuhausen": [47.68, 8.61]}), encoding="utf-8")
+    monkeypatch.setattr(server, "GEOCODER", "static")
+    monkeypatch.setattr(server, "STATIC_GEOCODER_FILE", str(table))
+
+    geocoder = create_geocoder()
+
+    assert isinstance(geocoder, StaticGeocoder)
+    assert geocoder.coordinates == {"rheinfallquai 32 8212 neuhausen": (47.68, 8.61)}
+
+
+def test_geocoding_is_off_by_default(monkeypatch):
+    monkeypatch.setattr(server, "GEOCODER", "none")
+
+    assert create_geocoder() is None
+
+
+def test_geocoder_subclasses_must_implement_geocode():
+    class Incomplete(Geocoder):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,67 @@
+import orjson
+
+from server import CURRENT_SCHEMA_VERSION, Excursion, empty_rating_histogram, excursion_listing_dict, upgrade_legacy_excursion
+
+DOCUMENT = {
+    "id": "3f0c8e52-4a8f-4f0e-9d55-0d6c1f2b7a10",
+    "title": "Rheinfall",
+    "description": "Der grösste Wasserfall Europas mit Aussichtsplattformen und Bootsfahrten.",
+    "address": "Rheinfallquai 32, 8212 Neuhausen",
+    "country": "Schweiz",
+    "region": "Schaffhausen",
+    "category": "Wanderung",
+    "website_url": "https://www.rheinfall.ch",
+    "has_grill": True,
+    "is_outdoor": True,
+    "is_free": False,
+    "parking_situation": "Gut",
+    "parking_is_free": False,
+    "lat": 47.6779,
+    "lng": 8.6155,
+    "author_id": "user-1",
+    "author_name": "Anna",
+    "photos": ["a3f1.jpg"],
+    "average_rating": 4.5,
+    "review_count": 2,
+    "rating_sum": 9,
+    "rating_histogram": {**empty_rating_histogram(), "4": 1, "5": 1},
+    "created_at": "2024-05-01T08:30:00.123456+00:00",
+    "schema_version": CURRENT_SCHEMA_VERSION,
+}
+
+
+def model_json(doc: dict):
+    """What response_model=List[Excursion] sent before the fast path"""
+    return orjson.loads(Excursion(**upgrade_legacy_excursion(dict(doc))).model_dump_json())
+
+
+def listing_json(doc: dict):
+    return orjson.loads(orjson.dumps(excursion_listing_dict(dict(doc)), option=orjson.OPT_UTC_Z))
+
+
+def test_listing_matches_the_model():
+    assert listing_json(DOCUMENT) == model_json(DOCUMENT)
+
+
+def test_integer_average_is_sent_as_a_float():
+    doc = {**DOCUMENT, "average_rating": 4}
+
+    assert listing_json(doc) == model_json(doc)
+    assert isinstance(excursion_listing_dict(dict(doc))["average_rating"], float)
+
+
+def test_missing_optional_fields_get_the_model_defaults():
+    doc = {key: value for key, value in DOCUMENT.items()
+           if key not in ("photos", "average_rating", "review_count", "rating_sum", "rating_histogram", "website_url")}
+
+    assert listing_json(doc) == model_json(doc)
+
+
+def test_legacy_canton_document_matches_the_model():
+    doc = {key: value for key, value in DOCUMENT.items() if key not in ("country", "region", "schema_version")}
+    doc["canton"] = "Schaffhausen"
+
+    result = listing_json(doc)
+    assert result == model_json(doc)
+    assert (result["country"], result["region"]) == ("Schweiz", "Schaffhausen")
+    assert "canton" not in result and "schema_version" not in result
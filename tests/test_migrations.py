@@ -0,0 +1,49 @@
+import pytest
+
+import server
+from server import CURRENT_SCHEMA_VERSION, ensure_schema_current, upgrade_legacy_excursion
+
+
+class Collection:
+    def __init__(self, count):
+        self.count = count
+        self.queries = []
+
+    async def count_documents(self, query, limit=0):
+        self.queries.append(query)
+        return self.count
+
+
+class Database:
+    def __init__(self, count):
+        self.excursions = Collection(count)
+
+
+def test_canton_document_gets_country_and_region():
+    doc = upgrade_legacy_excursion({"id": "1", "canton": "Bern"})
+
+    assert doc["country"] == "Schweiz"
+    assert doc["region"] == "Bern"
+
+
+def test_v1_document_passes_through_unchanged():
+    doc = {"id": "1", "schema_version": 1, "country": "Deutschland", "region": "Bayern"}
+
+    assert upgrade_legacy_excursion(dict(doc)) == doc
+
+
+@pytest.mark.asyncio
+async def test_startup_refuses_outdated_excursions(monkeypatch):
+    database = Database(count=1)
+    monkeypatch.setattr(server, "db", database)
+
+    with pytest.raises(RuntimeError, match="migrate.py"):
+        await ensure_schema_current()
+    assert database.excursions.queries == [server.outdated_excursions_query(CURRENT_SCHEMA_VERSION)]
+
+
+@pytest.mark.asyncio
+async def test_startup_passes_once_migrated(monkeypatch):
+    monkeypatch.setattr(server, "db", Database(count=0))
+
+    await ensure_schema_current()
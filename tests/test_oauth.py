@@ -0,0 +1,112 @@
+import json
+
+import pytest
+from fastapi import HTTPException
+
+import server
+from server import CircuitBreaker, fetch_oauth_session_data
+
+SESSION_DATA = {"id": "user-1", "email": "anna@example.com", "name": "Anna", "session_token": "token"}
+
+
+@pytest.fixture(autouse=True)
+def fresh_breaker(monkeypatch):
+    breaker = CircuitBreaker(server.AUTH_PROVIDER_FAILURE_THRESHOLD, server.AUTH_PROVIDER_RESET_SECONDS)
+    monkeypatch.setattr(server, "auth_provider_breaker", breaker)
+    return breaker
+
+
+@pytest.mark.asyncio
+async def test_returns_session_data(auth_provider):
+    auth_provider.responses = [(200, json.dumps(SESSION_DATA).encode())]
+
+    assert await fetch_oauth_session_data("session-1") == SESSION_DATA
+    assert auth_provider.requests == [("/auth/v1/env/oauth/session-data", "session-1")]
+
+
+@pytest.mark.asyncio
+async def test_retries_server_errors_and_dropped_connections(auth_provider, fresh_breaker):
+    auth_provider.responses = [(503, b""), (None, b""), (200, json.dumps(SESSION_DATA).encode())]
+
+    assert await fetch_oauth_session_data("session-1") == SESSION_DATA
+    assert len(auth_provider.requests) == 3
+    assert fresh_breaker.failures == 0
+
+
+@pytest.mark.asyncio
+async def test_client_error_is_not_retried(auth_provider, fresh_breaker):
+    auth_provider.responses = [(404, b'{"detail": "not found"}')]
+
+    with pytest.raises(HTTPException) as excinfo:
+        await fetch_oauth_session_data("expired")
+    assert excinfo.value.status_code == 400
+    assert len(auth_provider.requests) == 1
+    # The provider answered, so it counts as healthy
+    assert fresh_breaker.failures == 0
+
+
+@pytest.mark.asyncio
+async def test_invalid_json_is_an_invalid_session(auth_provider):
+    auth_provider.responses = [(200, b"<html>")]
+
+    with pytest.raises(HTTPException) as excinfo:
+        await fetch_oauth_session_data("session-1")
+    assert excinfo.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_exhausted_retries_open_the_breaker(auth_provider, fresh_breaker):
+    for _ in range(server.AUTH_PROVIDER_FAILURE_THRESHOLD):
+        with pytest.raises(HTTPException) as excinfo:
+            await fetch_oauth_session_data("session-1")
+        assert excinfo.value.status_code == 502
+    assert len(auth_provider.requests) == server.AUTH_PROVIDER_FAILURE_THRESHOLD * (server.AUTH_PROVIDER_RETRIES + 1)
+
+    # Open: fail fast without contacting the provider
+    with pytest.raises(HTTPException) as excinfo:
+        await fetch_oauth_session_data("session-1")
+    assert excinfo.value.status_code == 503
+    assert len(auth_provider.requests) == server.AUTH_PROVIDER_FAILURE_THRESHOLD * (server.AUTH_PROVIDER_RETRIES + 1)
+
+
+@pytest.mark.asyncio
+async def test_breaker_lets_a_trial_request_through_after_the_cooldown(auth_provider, fresh_breaker):
+    fresh_breaker.failures = fresh_breaker.failure_threshold
+    fresh_breaker.opened_at = server.time.monotonic() - fresh_breaker.reset_seconds
+    auth_provider.responses = [(200, json.dumps(SESSION_DATA).encode())]
+
+    assert await fetch_oauth_session_data("session-1") == SESSION_DATA
+    assert fresh_breaker.opened_at is None and fresh_breaker.failures == 0
+
+
+def test_half_open_breaker_reopens_after_one_failure():
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=0)
+    for _ in range(3):
+        breaker.record_failure()
+    assert breaker.allow_request()  # cooldown of 0 has passed
+    breaker.record_failure()
+    assert breaker.opened_at is not None
+
+
+def test_half_open_breaker_lets_only_one_trial_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30)
+    breaker.record_failure()
+    breaker.opened_at -= 30
+
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    assert not breaker.allow_request()
+
+    breaker.record_success()
+    assert breaker.allow_request() and breaker.allow_request()
+
+
+def test_abandoned_trial_stops_blocking_after_the_cooldown():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30)
+    breaker.record_failure()
+    breaker.opened_at -= 30
+    assert breaker.allow_request()
+
+    # The trial never reported back
+    breaker.trial_started_at -= 30
+    assert breaker.allow_request()
@@ -0,0 +1,79 @@
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from server import build_excursion_projection, decode_cursor, encode_cursor, finish_projected_excursion, keyset_filter
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("2024-05-01T10:00:00+00:00", "abc")
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == ("2024-05-01T10:00:00+00:00", "abc")
+
+
+def test_cursor_accepts_datetimes():
+    created_at = datetime(2024, 5, 1, 10, tzinfo=timezone.utc)
+
+    assert decode_cursor(encode_cursor(created_at, "abc")) == (created_at.isoformat(), "abc")
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", "bm90IGpzb24", "WzEsIDJd", "WyJhIl0"])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as excinfo:
+        decode_cursor(cursor)
+    assert excinfo.value.status_code == 400
+
+
+def test_keyset_filter_selects_everything_after_the_cursor():
+    assert keyset_filter(encode_cursor("2024-05-01T10:00:00+00:00", "m")) == {"$or": [
+        {"created_at": {"$lt": "2024-05-01T10:00:00+00:00"}},
+        {"created_at": "2024-05-01T10:00:00+00:00", "id": {"$lt": "m"}}
+    ]}
+
+
+def test_keyset_pages_cover_every_item_once():
+    items = sorted(
+        [{"created_at": f"2024-05-0{day}T10:00:00+00:00", "id": item_id} for day in (1, 2, 3) for item_id in "abc"],
+        key=lambda item: (item["created_at"], item["id"]),
+        reverse=True
+    )
+
+    def after(cursor):
+        # What Mongo does with keyset_filter under LISTING_SORT
+        clause = keyset_filter(cursor)["$or"]
+        return [
+            item for item in items
+            if item["created_at"] < clause[0]["created_at"]["$lt"]
+            or (item["created_at"] == clause[1]["created_at"] and item["id"] < clause[1]["id"]["$lt"])
+        ]
+
+    seen, page = [], items[:4]
+    while page:
+        seen.extend(page)
+        page = after(encode_cursor(page[-1]["created_at"], page[-1]["id"]))[:4]
+
+    assert seen == items
+
+
+def test_card_projection_carries_what_cards_and_map_markers_need():
+    projection = build_excursion_projection("card")
+
+    assert {"title", "address", "lat", "lng", "average_rating"} <= set(projection)
+    assert projection["photos"] == {"$slice": 1}
+
+
+def test_field_projection_rejects_unknown_fields():
+    with pytest.raises(HTTPException) as excinfo:
+        build_excursion_projection("title,password")
+    assert excinfo.value.detail == "Invalid fields: password"
+
+
+def test_projected_legacy_document_is_upgraded_and_stripped_of_helpers():
+    projection = build_excursion_projection("title,region")
+    doc = {"id": "1", "title": "Zoo", "canton": "Bern", "created_at": "2024-05-01T10:00:00+00:00"}
+
+    assert finish_projected_excursion(doc, projection) == {
+        "id": "1", "title": "Zoo", "region": "Bern", "created_at": "2024-05-01T10:00:00+00:00"
+    }
@@ -0,0 +1,26 @@
+import bcrypt
+
+import server
+from server import hash_password, password_needs_rehash, verify_password
+
+
+def test_hash_verifies_and_uses_the_configured_cost():
+    hashed = hash_password("geheim123")
+
+    assert verify_password("geheim123", hashed)
+    assert not verify_password("falsch", hashed)
+    assert not password_needs_rehash(hashed)
+
+
+def test_hash_with_another_cost_needs_rehash():
+    rounds = 4 if server.BCRYPT_ROUNDS != 4 else 5
+    hashed = bcrypt.hashpw(b"geheim123", bcrypt.gensalt(rounds=rounds)).decode()
+
+    assert verify_password("geheim123", hashed)
+    assert password_needs_rehash(hashed)
+
+
+def test_malformed_hashes_neither_verify_nor_ask_for_rehash():
+    for hashed in ["", "not-a-hash", "$2b$"]:
+        assert not verify_password("geheim123", hashed)
+        assert not password_needs_rehash(hashed)
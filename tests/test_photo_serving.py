@@ -0,0 +1,44 @@
+import pytest
+
+from server import etag_matches, parse_byte_range
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=100-", (100, 999)),
+    ("bytes=-100", (900, 999)),
+    ("bytes=-5000", (0, 999)),
+    ("bytes=900-5000", (900, 999)),
+    (" bytes = 10-20", (10, 20)),
+])
+def test_satisfiable_ranges(header, expected):
+    assert parse_byte_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header", [
+    "bytes=1000-",
+    "bytes=500-100",
+    "bytes=0-10,20-30",
+    "items=0-10",
+    "bytes=abc-",
+    "bytes=-",
+])
+def test_unsatisfiable_ranges(header):
+    assert parse_byte_range(header, 1000) is None
+
+
+def test_empty_file_has_no_satisfiable_range():
+    assert parse_byte_range("bytes=0-", 0) is None
+
+
+@pytest.mark.parametrize("header, expected", [
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"xyz", "abc"', True),
+    ("*", True),
+    ('"xyz"', False),
+    ('"ABC"', False),
+    ("", False),
+])
+def test_etag_matches(header, expected):
+    assert etag_matches(header, '"abc"') is expected
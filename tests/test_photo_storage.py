@@ -0,0 +1,286 @@
+import hashlib
+import os
+import time
+
+import pytest
+
+import server
+from server import UPLOAD_DIR, is_content_addressed, is_safe_photo_name, photo_path, scan_photo_storage, sweep_photo_storage
+
+DIGEST = hashlib.sha256(b"photo").hexdigest()
+
+
+def test_content_addressed_names_are_sha256_hex():
+    assert is_content_addressed(f"{DIGEST}.jpg")
+    assert not is_content_addressed("9b3e8fd5-3c0e-4f6a-9b1e-2f4a5c6d7e8f.jpg")
+    assert not is_content_addressed(f"{DIGEST.upper()}.jpg")
+    assert not is_content_addressed(f"{DIGEST[:-1]}.jpg")
+
+
+def test_content_addressed_photos_are_sharded_by_hash_prefix():
+    assert photo_path(f"{DIGEST}.png") == UPLOAD_DIR / DIGEST[:2] / DIGEST[2:4] / f"{DIGEST}.png"
+
+
+def test_legacy_photos_stay_flat():
+    name = "9b3e8fd5-3c0e-4f6a-9b1e-2f4a5c6d7e8f.jpg"
+
+    assert photo_path(name) == UPLOAD_DIR / name
+
+
+@pytest.mark.parametrize("name, expected", [
+    (f"{DIGEST}.jpg", True),
+    ("legacy.jpg", True),
+    ("../server.py", False),
+    ("variants/x.jpg", False),
+    (".upload.part", False),
+])
+def test_is_safe_photo_name(name, expected):
+    assert is_safe_photo_name(name) is expected
+
+
+LEGACY = "9b3e8fd5-3c0e-4f6a-9b1e-2f4a5c6d7e8f.jpg"
+ORPHAN = hashlib.sha256(b"orphan").hexdigest()
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    variants = tmp_path / "variants"
+    variants.mkdir()
+    monkeypatch.setattr(server, "UPLOAD_DIR", tmp_path)
+    monkeypatch.setattr(server, "VARIANT_DIR", variants)
+    return tmp_path
+
+
+def write(path, age_seconds=2 * 60 * 60):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"photo")
+    stamp = time.time() - age_seconds
+    os.utime(path, (stamp, stamp))
+    return path
+
+
+def test_scan_sorts_originals_variants_and_stale_uploads(storage):
+    write(storage / DIGEST[:2] / DIGEST[2:4] / f"{DIGEST}.jpg")
+    write(storage / LEGACY)
+    write(storage / "variants" / f"{DIGEST}_thumb.webp")
+    stale = write(storage / ".upload.part")
+    write(storage / f"{ORPHAN}.jpg", age_seconds=0)
+
+    originals, variant_stems, stale_temp_files = scan_photo_storage(60 * 60)
+
+    assert originals == {f"{DIGEST}.jpg", LEGACY}
+    assert variant_stems == {DIGEST}
+    assert stale_temp_files == [stale]
+
+
+class Excursions:
+    def __init__(self, empty):
+        self.empty = empty
+
+    async def find_one(self, query, projection):
+        return None if self.empty else {"_id": 1}
+
+
+class Database:
+    def __init__(self, empty=False):
+        self.excursions = Excursions(empty)
+
+
+@pytest.fixture
+def queued_cleanup(monkeypatch):
+    queued = []
+
+    async def enqueue_photo_cleanup(photo_names, session=None):
+        queued.extend(photo_names)
+
+    monkeypatch.setattr(server, "enqueue_photo_cleanup", enqueue_photo_cleanup)
+    return queued
+
+
+@pytest.fixture
+def queued(monkeypatch, queued_cleanup):
+    async def reconcile_photo_references(dry_run=False):
+        return {f"{DIGEST}.jpg"}
+
+    monkeypatch.setattr(server, "reconcile_photo_references", reconcile_photo_references)
+    return queued_cleanup
+
+
+def fill_storage(storage):
+    write(storage / DIGEST[:2] / DIGEST[2:4] / f"{DIGEST}.jpg")
+    write(storage / ORPHAN[:2] / ORPHAN[2:4] / f"{ORPHAN}.png")
+    write(storage / "variants" / f"{ORPHAN}_card.jpg")
+    write(storage / LEGACY)
+    write(storage / "variants" / f"{LEGACY[:-4]}_card.jpg")
+    return write(storage / ".upload.part")
+
+
+@pytest.mark.asyncio
+async def test_sweep_reclaims_only_content_addressed_orphans(storage, queued, monkeypatch):
+    monkeypatch.setattr(server, "db", Database())
+    stale = fill_storage(storage)
+
+    assert await sweep_photo_storage() == 2
+    assert sorted(queued) == sorted([f"{ORPHAN}.png", f"{ORPHAN}.jpg"])
+    assert (storage / LEGACY).exists()
+    assert not stale.exists()
+
+
+@pytest.mark.asyncio
+async def test_dry_run_sweep_changes_nothing(storage, queued, monkeypatch):
+    monkeypatch.setattr(server, "db", Database())
+    stale = fill_storage(storage)
+
+    assert await sweep_photo_storage(dry_run=True) == 2
+    assert queued == []
+    assert stale.exists()
+
+
+@pytest.mark.asyncio
+async def test_sweep_skips_a_database_without_excursions(storage, queued, monkeypatch):
+    monkeypatch.setattr(server, "db", Database(empty=True))
+    stale = fill_storage(storage)
+
+    assert await sweep_photo_storage() == 0
+    assert queued == []
+    assert stale.exists()
+
+
+class Rows:
+    def __init__(self, rows):
+        self.rows = iter(rows)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self.rows)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class Result:
+    modified_count = deleted_count = 1
+
+
+class Photos:
+    def __init__(self, records):
+        self.records = records
+        self.updates, self.deletes = [], []
+
+    def find(self, query):
+        return Rows(self.records)
+
+    async def update_one(self, query, update):
+        self.updates.append((query["_id"], update["$set"]["ref_count"]))
+        return Result()
+
+    async def delete_one(self, query):
+        self.deletes.append(query["_id"])
+        return Result()
+
+
+class ReferencingExcursions:
+    def __init__(self, counts):
+        self.counts = counts
+
+    def aggregate(self, pipeline):
+        return Rows([{"_id": name, "count": count} for name, count in self.counts.items()])
+
+
+class ReconcileDatabase:
+    def __init__(self, counts, records):
+        self.excursions = ReferencingExcursions(counts)
+        self.photos = Photos(records)
+
+
+def photo_record(name, ref_count, referenced_at=None):
+    return {"_id": name, "filename": name, "ref_count": ref_count, "referenced_at": referenced_at}
+
+
+@pytest.fixture
+def reconcile_database(monkeypatch, queued_cleanup):
+    old = server.datetime.now(server.timezone.utc) - server.timedelta(seconds=server.PHOTO_SWEEP_GRACE_SECONDS + 60)
+    database = ReconcileDatabase(
+        {"kept.jpg": 2, "drifted.jpg": 3},
+        [
+            photo_record("kept.jpg", 2, old),
+            photo_record("drifted.jpg", 1, old),
+            photo_record("unused.jpg", 1, old),
+            photo_record("uploading.jpg", 1, server.datetime.now(server.timezone.utc)),
+        ]
+    )
+    monkeypatch.setattr(server, "db", database)
+    return database
+
+
+@pytest.mark.asyncio
+async def test_reconcile_corrects_counts_and_releases_unused_records(reconcile_database, queued_cleanup):
+    referenced = await server.reconcile_photo_references()
+
+    assert referenced == {"kept.jpg", "drifted.jpg", "uploading.jpg"}
+    assert reconcile_database.photos.updates == [("drifted.jpg", 3)]
+    assert reconcile_database.photos.deletes == ["unused.jpg"]
+    assert queued_cleanup == ["unused.jpg"]
+
+
+@pytest.mark.asyncio
+async def test_dry_run_reconcile_writes_nothing(reconcile_database, queued_cleanup):
+    referenced = await server.reconcile_photo_references(dry_run=True)
+
+    assert referenced == {"kept.jpg", "drifted.jpg", "uploading.jpg"}
+    assert reconcile_database.photos.updates == reconcile_database.photos.deletes == queued_cleanup == []
+
+
+class CleanupQueue:
+    def __init__(self):
+        self.rescheduled, self.done = [], []
+
+    async def update_one(self, query, update):
+        self.rescheduled.append((query["_id"], update["$set"]))
+
+    async def delete_one(self, query):
+        self.done.append(query["_id"])
+
+
+class CleanupDatabase:
+    def __init__(self):
+        self.photo_cleanup = CleanupQueue()
+
+
+@pytest.mark.asyncio
+async def test_failed_cleanup_is_retried_with_backoff(monkeypatch):
+    database = CleanupDatabase()
+    monkeypatch.setattr(server, "db", database)
+
+    async def remove_photo_files(photo_name):
+        raise OSError("disk unavailable")
+
+    monkeypatch.setattr(server, "remove_photo_files", remove_photo_files)
+    before = server.datetime.now(server.timezone.utc)
+
+    await server.run_photo_cleanup_job({"_id": "job-1", "photo_name": LEGACY, "attempts": 3})
+
+    [(job_id, update)] = database.photo_cleanup.rescheduled
+    assert job_id == "job-1" and database.photo_cleanup.done == []
+    delay = (update["next_attempt_at"] - before).total_seconds()
+    assert server.PHOTO_CLEANUP_RETRY_BASE_SECONDS * 4 <= delay < server.PHOTO_CLEANUP_RETRY_BASE_SECONDS * 4 + 5
+    assert update["last_error"] == "disk unavailable"
+
+
+@pytest.mark.asyncio
+async def test_finished_cleanup_leaves_the_queue(monkeypatch):
+    database = CleanupDatabase()
+    monkeypatch.setattr(server, "db", database)
+    removed = []
+
+    async def remove_photo_files(photo_name):
+        removed.append(photo_name)
+
+    monkeypatch.setattr(server, "remove_photo_files", remove_photo_files)
+
+    await server.run_photo_cleanup_job({"_id": "job-1", "photo_name": LEGACY, "attempts": 1})
+
+    assert removed == [LEGACY]
+    assert database.photo_cleanup.done == ["job-1"] and database.photo_cleanup.rescheduled == []
@@ -0,0 +1,76 @@
+import pytest
+from fastapi import HTTPException
+from pymongo.errors import DuplicateKeyError
+
+import server
+from server import byte_limited_receive, detect_image_format, store_photo_blob
+
+
+@pytest.mark.parametrize("header, expected", [
+    (b"\xff\xd8\xff\xe0\x00\x10JFIF", "jpg"),
+    (b"\x89PNG\r\n\x1a\n\x00\x00", "png"),
+    (b"GIF89a\x01\x00", "gif"),
+    (b"GIF87a\x01\x00", "gif"),
+    (b"RIFF\x24\x00\x00\x00WEBPVP8 ", "webp"),
+    (b"RIFF\x24\x00\x00\x00WAVEfmt ", None),
+    (b"<svg xmlns=", None),
+    (b"%PDF-1.7", None),
+    (b"", None),
+])
+def test_detect_image_format(header, expected):
+    assert detect_image_format(header) == expected
+
+
+def body_messages(*chunks):
+    messages = [{"type": "http.request", "body": chunk, "more_body": True} for chunk in chunks]
+    messages[-1]["more_body"] = False
+
+    async def receive():
+        return messages.pop(0)
+    return receive
+
+
+@pytest.mark.asyncio
+async def test_body_within_the_limit_passes_through():
+    receive = byte_limited_receive(body_messages(b"a" * 6, b"b" * 4), limit=10)
+
+    assert (await receive())["body"] == b"a" * 6
+    assert (await receive())["body"] == b"b" * 4
+
+
+@pytest.mark.asyncio
+async def test_body_over_the_limit_is_rejected_while_streaming():
+    receive = byte_limited_receive(body_messages(b"a" * 6, b"b" * 6, b"c"), limit=10)
+
+    await receive()
+    with pytest.raises(HTTPException) as excinfo:
+        await receive()
+    assert excinfo.value.status_code == 413
+
+
+class DeletingPhotos:
+    """photos collection while the cleanup worker holds the 'deleting' record"""
+
+    async def find_one_and_update(self, *args, **kwargs):
+        raise DuplicateKeyError("E11000 duplicate key error")
+
+    async def delete_one(self, query):
+        pass
+
+
+class Database:
+    photos = DeletingPhotos()
+
+
+@pytest.mark.asyncio
+async def test_upload_gives_up_on_a_photo_being_deleted(monkeypatch, tmp_path):
+    monkeypatch.setattr(server, "db", Database())
+    monkeypatch.setattr(server, "PHOTO_DELETING_WAIT_SECONDS", 0.2)
+    temp_path = tmp_path / ".upload.part"
+    temp_path.write_bytes(b"photo")
+
+    with pytest.raises(HTTPException) as excinfo:
+        await store_photo_blob(temp_path, f"{'a' * 64}.jpg", 5)
+    assert excinfo.value.status_code == 503
+    assert excinfo.value.headers == {"Retry-After": "1"}
+    assert not temp_path.exists()
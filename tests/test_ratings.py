@@ -0,0 +1,21 @@
+from server import compute_average_rating, empty_rating_histogram
+
+
+def test_empty_histogram_has_a_zero_per_star():
+    assert empty_rating_histogram() == {"1": 0, "2": 0, "3": 0, "4": 0, "5": 0}
+
+
+def test_each_histogram_is_a_fresh_dict():
+    histogram = empty_rating_histogram()
+    histogram["5"] += 1
+
+    assert empty_rating_histogram()["5"] == 0
+
+
+def test_average_is_rounded_to_one_decimal():
+    assert compute_average_rating(17, 4) == 4.2
+    assert compute_average_rating(5, 1) == 5.0
+
+
+def test_no_reviews_average_to_zero():
+    assert compute_average_rating(0, 0) == 0.0
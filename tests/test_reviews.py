@@ -0,0 +1,67 @@
+import inspect
+
+import pytest
+from fastapi import Response
+
+import server
+from server import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, fetch_review_page
+
+
+class Cursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    async def to_list(self, length):
+        return self.documents[:length]
+
+
+class Collection:
+    def __init__(self, documents):
+        self.documents = documents
+        self.pipelines = []
+
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        limit = next(stage["$limit"] for stage in pipeline if "$limit" in stage)
+        return Cursor(self.documents[:limit])
+
+
+class Database:
+    def __init__(self, documents):
+        self.reviews = Collection(documents)
+
+
+def reviews(count):
+    return [{"id": f"review-{i}", "created_at": f"2024-05-{count - i:02d}T08:00:00+00:00"} for i in range(count)]
+
+
+@pytest.mark.parametrize("endpoint", [server.get_reviews, server.get_user_reviews])
+def test_review_listings_default_to_a_bounded_page(endpoint):
+    limit = inspect.signature(endpoint).parameters["limit"].default
+
+    assert limit.default == DEFAULT_PAGE_SIZE
+    assert limit.metadata[-1].le == MAX_PAGE_SIZE
+
+
+@pytest.mark.asyncio
+async def test_full_page_is_limited_and_has_a_next_cursor(monkeypatch):
+    database = Database(reviews(5))
+    monkeypatch.setattr(server, "db", database)
+    response = Response()
+
+    page = await fetch_review_page({"excursion_id": "1"}, response, 3, None, None)
+
+    assert [review["id"] for review in page] == ["review-0", "review-1", "review-2"]
+    assert {"$limit": 3} in database.reviews.pipelines[0]
+    assert NEXT_CURSOR_HEADER in response.headers
+
+
+@pytest.mark.asyncio
+async def test_last_page_has_no_next_cursor(monkeypatch):
+    monkeypatch.setattr(server, "db", Database(reviews(2)))
+    response = Response()
+
+    page = await fetch_review_page({"excursion_id": "1"}, response, 3, None, None)
+
+    assert len(page) == 2
+    assert NEXT_CURSOR_HEADER not in response.headers